@@ -0,0 +1,79 @@
+# 二元组计数与建图的耗时和峰值内存：以 (str, str) 元组为键的 Counter（旧）vs 整数打包键的 EdgeCounter（新）
+# 每种组合在独立的子进程中运行，峰值内存取子进程的最大常驻内存（ru_maxrss），包含分词等全部开销
+# 运行方式：python -m benchmarks.bench_edge_counting [--size 1GB] [--seed 0] [--target csr networkx]
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import parse_size, write_corpus
+
+VARIANTS = ("tuple", "packed")
+TARGETS = ("count", "csr", "networkx")
+
+
+def run_variant(variant, target, corpus_file):
+    from csr_graph import CSRGraph
+    from graph_builder import count_edge_arrays, count_edge_weights, graph_from_edge_arrays, graph_from_edge_weights, iter_words, read_chunks
+
+    begin = time.perf_counter()
+    with open(corpus_file, "r") as file:
+        words = iter_words(read_chunks(file))
+        if variant == "tuple":
+            edge_weights = count_edge_weights(words)
+            edges = len(edge_weights)
+            if target == "csr":
+                CSRGraph.from_edge_weights(edge_weights)
+            elif target == "networkx":
+                graph_from_edge_weights(edge_weights)
+        else:
+            arrays = count_edge_arrays(words)
+            edges = len(arrays[1])
+            if target == "csr":
+                CSRGraph.from_edge_arrays(*arrays)
+            elif target == "networkx":
+                graph_from_edge_arrays(*arrays)
+    seconds = time.perf_counter() - begin
+    # Linux 上 ru_maxrss 的单位为 KB
+    return {"seconds": seconds, "peak_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024, "edges": edges}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_edge_counting", description="二元组计数的耗时与峰值内存")
+    parser.add_argument("--size", default="100MB", help="合成语料的大小，如 100MB、1GB")
+    parser.add_argument("--seed", type=int, default=0, help="语料的随机种子")
+    parser.add_argument("--target", nargs="+", choices=TARGETS, default=["count", "csr"],
+                        help="count 只计数；csr / networkx 计数后建图")
+    parser.add_argument("--run", nargs=3, metavar=("VARIANT", "TARGET", "FILE"), help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.run:
+        print(json.dumps(run_variant(*args.run)))
+        return
+
+    size = parse_size(args.size)
+    corpus_dir = tempfile.mkdtemp()
+    corpus_file = write_corpus(os.path.join(corpus_dir, "corpus.txt"), size, args.seed)
+    try:
+        print(f"corpus: {size} bytes")
+        for target in args.target:
+            for variant in VARIANTS:
+                output = subprocess.run([sys.executable, "-m", "benchmarks.bench_edge_counting", "--run", variant, target, corpus_file],
+                                        check=True, capture_output=True, text=True).stdout
+                result = json.loads(output)
+                print(f"{target:<9} {variant:<7} {result['seconds']:8.1f} s  peak {result['peak_bytes'] / (1 << 20):8.0f} MB"
+                      f"  ({result['edges']} edges)")
+    finally:
+        os.remove(corpus_file)
+        os.rmdir(corpus_dir)
+
+
+if __name__ == "__main__":
+    main()
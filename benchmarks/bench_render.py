@@ -0,0 +1,35 @@
+# 连续多次最短路径查询的渲染耗时与内存：应保持平稳，不随查询次数增长
+# 运行方式：python -m benchmarks.bench_render [查询次数]
+import os
+import random
+import sys
+import tempfile
+import time
+import resource
+
+from graph_builder import build_directed_graph
+from render import find_shortest
+
+
+def main():
+    queries = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rng = random.Random(0)
+    vocab = [f"w{i}" for i in range(20)]
+    graph = build_directed_graph(" ".join(rng.choice(vocab) for _ in range(100)))
+    words = list(graph.nodes())
+
+    output_dir = tempfile.mkdtemp()
+    os.chdir(output_dir)
+    batch_begin = time.perf_counter()
+    for i in range(1, queries + 1):
+        find_shortest(graph, rng.choice(words), rng.choice(words))
+        if i == 1 or i % 50 == 0:
+            elapsed = time.perf_counter() - batch_begin
+            # ru_maxrss 在 Linux 上以 KB 为单位
+            peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            print(f"query {i:4d}: {elapsed * 1000 / (1 if i == 1 else 50):7.1f} ms/query, peak RSS {peak_rss:6.1f} MB")
+            batch_begin = time.perf_counter()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# 对比旧版（逐条复制路径入堆）与前驱 DAG 版 all_shortest_paths
+# 运行方式：python -m benchmarks.bench_shortest_paths
+import heapq
+import time
+
+import networkx as nx
+
+from shortest_paths import all_shortest_paths
+
+
+def legacy_all_shortest_paths(graph, start, target, weight='weight'):
+    # 改写前的实现，仅用于对比
+    queue = [(0, start, [])]
+    min_dist = {start: 0}
+    all_paths = []
+
+    while queue:
+        cost, current_node, path = heapq.heappop(queue)
+        path = path + [current_node]
+
+        if current_node == target:
+            all_paths.append((cost, path))
+            continue
+
+        for neighbor, data in graph[current_node].items():
+            edge_weight = data.get(weight, 1)
+            new_cost = cost + edge_weight
+
+            if neighbor not in min_dist or new_cost <= min_dist[neighbor]:
+                min_dist[neighbor] = new_cost
+                heapq.heappush(queue, (new_cost, neighbor, path))
+
+    if not all_paths:
+        return None
+
+    min_cost = min(all_paths, key=lambda x: x[0])[0]
+    return [path for cost, path in all_paths if cost == min_cost]
+
+
+def layered_graph(layers, width):
+    # 稠密分层图：相邻两层之间全连接且权值相同，最短路径条数为 width ** (layers - 1)
+    graph = nx.DiGraph()
+    for layer in range(layers - 1):
+        for i in range(width):
+            for j in range(width):
+                graph.add_edge(f"n{layer}_{i}", f"n{layer + 1}_{j}", weight=1)
+    graph.add_edge("start", "n0_0", weight=1)
+    for j in range(width):
+        graph.add_edge(f"n{layers - 1}_{j}", "target", weight=1)
+    return graph
+
+
+def timed(func, *args, **kwargs):
+    begin = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - begin, result
+
+
+def main():
+    for layers, width in [(4, 4), (6, 4), (7, 4), (5, 8)]:
+        graph = layered_graph(layers, width)
+        legacy_time, legacy_paths = timed(legacy_all_shortest_paths, graph, "start", "target")
+        new_time, new_paths = timed(all_shortest_paths, graph, "start", "target")
+        capped_time, _ = timed(all_shortest_paths, graph, "start", "target", max_paths=10)
+        assert sorted(legacy_paths) == sorted(new_paths)
+        print(f"layers={layers} width={width} paths={len(new_paths)}: "
+              f"legacy {legacy_time * 1000:.1f} ms, dag {new_time * 1000:.1f} ms, "
+              f"dag(max_paths=10) {capped_time * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# 冷启动耗时：
+#   1. 用 python -X importtime 测量各入口模块的累计导入时间
+#   2. 运行图形界面的 main()，测量从开始导入到创建主窗口（tk.Tk()）、以及到主窗口首次空闲
+#      （已显示，主循环开始处理事件）的时间，包括加载图快照等启动时的全部工作
+# 均与预算比较。没有显示器时只测量到创建主窗口为止
+# 运行方式：python -m benchmarks.bench_startup [重复次数] [语料文件]
+import json
+import os
+import subprocess
+import sys
+
+# 各入口模块的导入时间预算（毫秒）
+BUDGETS_MS = {
+    "main": 150,
+    "cli": 100,
+}
+
+# 图形界面启动各阶段的预算（毫秒）：before_window 为创建主窗口之前，first_window 为主窗口首次空闲
+WINDOW_BUDGETS_MS = {
+    "before_window": 300,
+    "first_window": 500,
+}
+
+# 在子进程中运行 main()：记录 tk.Tk() 被调用和主循环首次空闲的时刻，随后关闭窗口
+WINDOW_PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import tkinter as tk
+marks = {}
+
+def report():
+    print(json.dumps(marks))
+    sys.stdout.flush()
+
+original_init = tk.Tk.__init__
+def init(self, *args, **kwargs):
+    marks["before_window"] = (time.perf_counter() - start) * 1000
+    try:
+        original_init(self, *args, **kwargs)
+    except tk.TclError:
+        report()  # 没有显示器
+        sys.exit(0)
+tk.Tk.__init__ = init
+
+def first_idle(root):
+    marks["first_window"] = (time.perf_counter() - start) * 1000
+    report()
+    root.destroy()
+
+original_mainloop = tk.Tk.mainloop
+def mainloop(self, n=0):
+    self.after_idle(first_idle, self)
+    original_mainloop(self, n)
+tk.Tk.mainloop = mainloop
+
+import main
+main.main(["--input", sys.argv[1]])
+'''
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 这些重量级模块不应在启动时被导入
+FORBIDDEN_AT_STARTUP = ("matplotlib", "networkx", "PIL")
+
+
+def measure(module):
+    # 返回 (累计导入耗时毫秒, 导入过程中加载的所有模块名)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, check=True, cwd=ROOT_DIR)
+    cumulative_us = None
+    imported = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = [field.strip() for field in line[len("import time:"):].split("|")]
+        if not fields[1].isdigit():
+            continue
+        name = fields[2]
+        imported.append(name)
+        if name == module:
+            cumulative_us = int(fields[1])
+    return cumulative_us / 1000, imported
+
+
+def measure_window(input_file):
+    # 返回 {阶段: 毫秒}；没有显示器时只有 before_window
+    result = subprocess.run([sys.executable, "-c", WINDOW_PROBE, os.path.abspath(input_file)],
+                            capture_output=True, text=True, check=True, cwd=ROOT_DIR)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    input_file = sys.argv[2] if len(sys.argv) > 2 else os.path.join(ROOT_DIR, "input.txt")
+    failed = False
+    for module, budget in BUDGETS_MS.items():
+        # 取多次测量的最小值，减少磁盘缓存等因素的干扰
+        timings = []
+        for _ in range(repeat):
+            elapsed, imported = measure(module)
+            timings.append(elapsed)
+        best = min(timings)
+        heavy = sorted({name for name in imported if name.split(".")[0] in FORBIDDEN_AT_STARTUP})
+        status = "ok" if best <= budget and not heavy else "OVER BUDGET"
+        failed = failed or status != "ok"
+        print(f"{module:<6} {best:7.1f} ms (budget {budget} ms) {status}")
+        if heavy:
+            print(f"       heavy modules imported at startup: {', '.join(heavy)}")
+
+    # 第一次运行可能需要建图并写入快照，不计入结果
+    measure_window(input_file)
+    runs = [measure_window(input_file) for _ in range(repeat)]
+    for stage, budget in WINDOW_BUDGETS_MS.items():
+        timings = [run[stage] for run in runs if stage in run]
+        if not timings:
+            print(f"{stage:<13} skipped (no display)")
+            continue
+        best = min(timings)
+        status = "ok" if best <= budget else "OVER BUDGET"
+        failed = failed or status != "ok"
+        print(f"{stage:<13} {best:7.1f} ms (budget {budget} ms) {status}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
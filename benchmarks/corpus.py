@@ -0,0 +1,73 @@
+# 可复现的合成语料：词频服从 Zipf 分布，同一组参数总是生成完全相同的文本
+# 运行方式：python -m benchmarks.corpus 输出文件 [--size 10MB] [--seed 0]
+import argparse
+import itertools
+import random
+import string
+
+# 每批生成的词数，写文件时逐批写出，内存占用与语料大小无关
+BLOCK_WORDS = 1 << 16
+SIZE_UNITS = {"B": 1, "KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30}
+PUNCTUATION = [" "] * 12 + [", ", ". ", "\n", "? ", "! ", "; "]
+
+
+def parse_size(text):
+    # "1KB"、"10MB"、"1GB" 或字节数
+    text = text.strip().upper()
+    for unit in sorted(SIZE_UNITS, key=len, reverse=True):
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * SIZE_UNITS[unit])
+    return int(text)
+
+
+def make_vocabulary(rng, vocab_size):
+    vocab = set()
+    while len(vocab) < vocab_size:
+        vocab.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(1, 10))))
+    # 排序后再打乱，结果只取决于种子而与集合的迭代顺序无关
+    vocab = sorted(vocab)
+    rng.shuffle(vocab)
+    return vocab
+
+
+def iter_blocks(size_bytes, seed=0, vocab_size=50000, exponent=1.1):
+    # 逐批产生文本，总长度（字符数，均为 ASCII）恰好为 size_bytes
+    rng = random.Random(seed)
+    vocab = make_vocabulary(rng, vocab_size)
+    # 第 k 个词的频率与 1/k^exponent 成正比；首字母大写的词用于测试大小写归一
+    cum_weights = list(itertools.accumulate(1 / rank ** exponent for rank in range(1, vocab_size + 1)))
+    remaining = size_bytes
+    while remaining > 0:
+        words = rng.choices(vocab, cum_weights=cum_weights, k=BLOCK_WORDS)
+        separators = rng.choices(PUNCTUATION, k=BLOCK_WORDS)
+        block = "".join(word.capitalize() + separator if separator in (". ", "\n") else word + separator
+                        for word, separator in zip(words, separators))
+        block = block[:remaining]
+        remaining -= len(block)
+        yield block
+
+
+def generate_corpus(size_bytes, seed=0, vocab_size=50000, exponent=1.1):
+    return "".join(iter_blocks(size_bytes, seed, vocab_size, exponent))
+
+
+def write_corpus(path, size_bytes, seed=0, vocab_size=50000, exponent=1.1):
+    with open(path, "w") as file:
+        for block in iter_blocks(size_bytes, seed, vocab_size, exponent):
+            file.write(block)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.corpus", description="生成合成语料")
+    parser.add_argument("output")
+    parser.add_argument("--size", default="10MB", help="语料大小，如 1KB、10MB、1GB")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--vocab-size", type=int, default=50000)
+    parser.add_argument("--exponent", type=float, default=1.1, help="Zipf 分布的指数")
+    args = parser.parse_args()
+    write_corpus(args.output, parse_size(args.size), args.seed, args.vocab_size, args.exponent)
+
+
+if __name__ == "__main__":
+    main()
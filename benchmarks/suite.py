@@ -0,0 +1,185 @@
+# 基准测试套件：在可复现的合成语料上测量各公开操作的耗时与峰值内存，结果写入 JSON，
+# 并与保存的基线比较，耗时或内存超出阈值的操作标记为退化（退出码为 1）
+# 仓库中的 benchmarks/baseline.json 是在一台开发机上以默认参数（1MB，种子 0）记录的，耗时与机器相关：
+# 在其他机器上比较前，先在改动前的代码上用 --save-baseline 重新记录基线
+# 运行方式：python -m benchmarks.suite [--size 1MB] [--seed 0] [--output results.json]
+#                                      [--baseline benchmarks/baseline.json] [--save-baseline]
+#                                      [--only 操作...]
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.corpus import generate_corpus, parse_size, write_corpus
+from bridge_words import find_bridge_words, generate_by_bridge_words, rank_bridge_words
+from graph_builder import build_directed_graph, build_directed_graph_streaming, preprocess_text
+from shortest_paths import all_shortest_paths
+from traversal import traverse_graph
+from walks import WalkEngine
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+QUERY_COUNT = 200  # 桥接词查询的次数
+SHORTEST_PATH_QUERIES = 20  # 最短路径查询的次数（不可达时需要遍历整个图，单次较慢）
+MAX_PATHS = 100  # 每次最短路径查询最多枚举的路径数，避免路径数爆炸
+TOP_K = 5  # 带权桥接词查询返回的个数
+WALK_COUNT = 1000
+SENTENCE_WORDS = 1000  # 生成新文本时输入句子的词数
+MIN_REGRESSION_SECONDS = 0.01  # 耗时增加不足该值时不视为退化，毫秒级的操作受系统抖动影响较大
+IN_MEMORY_OPERATIONS = {"preprocess_text", "build_directed_graph"}  # 需要把整个语料读入内存的操作
+
+
+def make_operations(text, corpus_file, graph, seed):
+    # 返回 [(名称, 无参函数)]；查询参数预先用固定种子选好，每次运行完全相同
+    rng = random.Random(seed)
+    nodes = list(graph.nodes())
+    pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(QUERY_COUNT)]
+    sentence = " ".join(rng.choice(nodes) for _ in range(SENTENCE_WORDS))
+
+    def build_streaming():
+        with open(corpus_file, "r") as file:
+            return build_directed_graph_streaming(file)
+
+    return [
+        ("preprocess_text", lambda: preprocess_text(text)),
+        ("build_directed_graph", lambda: build_directed_graph(text)),
+        ("build_directed_graph_streaming", build_streaming),
+        ("find_bridge_words", lambda: [find_bridge_words(graph, word1, word2) for word1, word2 in pairs]),
+        ("rank_bridge_words", lambda: [rank_bridge_words(graph, word1, word2, TOP_K) for word1, word2 in pairs]),
+        ("all_shortest_paths", lambda: [all_shortest_paths(graph, word1, word2, max_paths=MAX_PATHS)
+                                        for word1, word2 in pairs[:SHORTEST_PATH_QUERIES]]),
+        ("traverse_graph", lambda: traverse_graph(graph)),
+        ("generate_by_bridge_words", lambda: generate_by_bridge_words(graph, sentence, random.Random(seed))),
+        ("random_walk", lambda: list(WalkEngine(graph).walks(WALK_COUNT, seed))),
+    ]
+
+
+def measure(func, repeat, memory=True):
+    # 耗时取多次运行的最小值；峰值内存单独运行一次，因为 tracemalloc 会显著拖慢执行
+    seconds = None
+    for _ in range(repeat):
+        gc.collect()
+        begin = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - begin
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+
+    peak_bytes = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {"seconds": seconds, "peak_bytes": peak_bytes}
+
+
+def compare(results, baseline, threshold):
+    # 返回退化列表：(操作, 指标, 基线值, 本次值)
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        for metric in ("seconds", "peak_bytes"):
+            old, new = previous.get(metric), current.get(metric)
+            if old and new is not None and new > old * (1 + threshold):
+                if metric == "seconds" and new - old < MIN_REGRESSION_SECONDS:
+                    continue
+                regressions.append((name, metric, old, new))
+    return regressions
+
+
+def format_value(metric, value):
+    if metric == "seconds":
+        return f"{value * 1000:.1f} ms"
+    return f"{value / (1 << 20):.1f} MB"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description="基准测试套件")
+    parser.add_argument("--size", default="1MB", help="合成语料的大小，如 1KB、10MB、1GB")
+    parser.add_argument("--seed", type=int, default=0, help="语料与查询的随机种子")
+    parser.add_argument("--repeat", type=int, default=3, help="每个操作计时的运行次数（取最小值）")
+    parser.add_argument("--no-memory", action="store_true", help="不测量峰值内存")
+    parser.add_argument("--only", nargs="+", help="只运行这些操作")
+    parser.add_argument("--output", default="benchmark_results.json", help="结果 JSON 文件")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="基线 JSON 文件")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果保存为基线")
+    parser.add_argument("--threshold", type=float, default=0.2, help="超出基线的比例达到该值即视为退化")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    size = parse_size(args.size)
+
+    # 语料写入临时文件，查询用的图由文件流式构建；
+    # 整个语料只在需要测量内存中的操作时才载入，只测流式建图和查询时可以使用 GB 级语料
+    corpus_dir = tempfile.mkdtemp()
+    corpus_file = write_corpus(os.path.join(corpus_dir, "corpus.txt"), size, args.seed)
+    with open(corpus_file, "r") as file:
+        graph = build_directed_graph_streaming(file)
+    text = None
+    if not args.only or IN_MEMORY_OPERATIONS & set(args.only):
+        text = generate_corpus(size, args.seed)
+    print(f"corpus: {size} bytes, {graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges")
+
+    results = {}
+    try:
+        for name, func in make_operations(text, corpus_file, graph, args.seed):
+            if args.only and name not in args.only:
+                continue
+            results[name] = measure(func, args.repeat, not args.no_memory)
+            peak = results[name]["peak_bytes"]
+            print(f"{name:<32} {format_value('seconds', results[name]['seconds']):>12}"
+                  + (f"  peak {format_value('peak_bytes', peak):>10}" if peak is not None else ""))
+    finally:
+        os.remove(corpus_file)
+        os.rmdir(corpus_dir)
+
+    report = {
+        "meta": {"size": size, "seed": args.seed, "repeat": args.repeat,
+                 "nodes": graph.number_of_nodes(), "edges": graph.number_of_edges(),
+                 "python": platform.python_version(), "machine": platform.machine(),
+                 "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; skipping comparison (record one with --save-baseline)")
+        return 0
+    with open(args.baseline, "r") as file:
+        baseline = json.load(file)
+    if baseline.get("meta", {}).get("size") != size or baseline.get("meta", {}).get("seed") != args.seed:
+        print("baseline was recorded with a different corpus size or seed; skipping comparison "
+              "(record one with --save-baseline)")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, metric, old, new in regressions:
+        print(f"REGRESSION {name} {metric}: {format_value(metric, old)} -> {format_value(metric, new)} "
+              f"(+{(new / old - 1) * 100:.0f}%)")
+    if not regressions:
+        print(f"no regressions against {args.baseline} (threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+import heapq
+import operator
+import random
+import weakref
+from functools import lru_cache, partial
+
+import instrument
+from graph_builder import preprocess_text
+from incremental import graph_version
+
+# 带权桥接词的打分方式：桥接词 b 的得分由 w(word1, b) 与 w(b, word2) 计算
+#   product  两条边权值的乘积，相当于两步转移频数的乘积
+#   min      较小的权值，即两条边中的瓶颈
+BRIDGE_SCORES = {
+    "product": operator.mul,
+    "min": min,
+}
+
+
+def get_bridge_score(score="product"):
+    if score not in BRIDGE_SCORES:
+        raise ValueError(f"Unknown bridge score: {score}")
+    return BRIDGE_SCORES[score]
+
+
+def top_bridge_words(scored, k=None):
+    # scored 为 (桥接词, 得分) 的可迭代对象；按得分从高到低返回前 k 个（k 为 None 时全部），
+    # 得分相同时保持 scored 中的先后顺序。给定 k 时用大小为 k 的堆，不需要先收集全部候选
+    key = operator.itemgetter(1)
+    if k is None:
+        return sorted(scored, key=key, reverse=True)
+    return heapq.nlargest(k, scored, key=key)
+
+
+# 桥接词引擎：预先计算每个节点的后继和前驱，
+# word1 到 word2 的桥接词即 successors(word1) ∩ predecessors(word2)
+class BridgeWordIndex:
+    def __init__(self, graph):
+        # 后继记录其在 word1 出边中的序号，使结果顺序与原先按出边遍历的顺序一致；
+        # 前驱记录边的权值：w(word1, b) 为 predecessors[b][word1]，w(b, word2) 为 predecessors[word2][b]
+        self.successors = {node: {} for node in graph.nodes()}
+        self.predecessors = {node: {} for node in graph.nodes()}
+        for node in graph.nodes():
+            for rank, (succ, data) in enumerate(graph[node].items()):
+                self.successors[node][succ] = rank
+                self.predecessors[succ][node] = data.get('weight', 1)
+
+    def update(self, graph, changed_edges):
+        # 增量更新：新出现的边追加到后继和前驱中，已有边只需更新权值
+        for word1, word2 in changed_edges:
+            for word in (word1, word2):
+                if word not in self.successors:
+                    self.successors[word] = {}
+                    self.predecessors[word] = {}
+            succ1 = self.successors[word1]
+            if word2 not in succ1:
+                # 新边追加在出边末尾，与 networkx 中的出边顺序保持一致
+                succ1[word2] = len(succ1)
+            self.predecessors[word2][word1] = graph[word1][word2].get('weight', 1)
+
+    def __contains__(self, word):
+        return word in self.successors
+
+    def query(self, word1, word2):
+        if word1 not in self.successors or word2 not in self.successors:
+            return None
+
+        # 简单路径不会重复经过 word1，因此 word1 与 word2 相同时没有桥接词
+        if word1 == word2:
+            return []
+
+        succ1 = self.successors[word1]
+        pred2 = self.predecessors[word2]
+
+        # 遍历较小的一侧，复杂度为 O(min(出度, 入度))
+        if len(succ1) <= len(pred2):
+            return [word for word in succ1 if word in pred2]
+        bridge_words = [word for word in pred2 if word in succ1]
+        bridge_words.sort(key=succ1.__getitem__)
+        return bridge_words
+
+    def query_many(self, pairs):
+        return [self.query(word1, word2) for word1, word2 in pairs]
+
+    def iter_scored(self, word1, word2, score="product"):
+        # 逐个产生 (桥接词, 得分)，同样只遍历较小的一侧，出度很大的枢纽词也只需 O(min(出度, 入度))
+        combine = get_bridge_score(score)
+        if word1 == word2 or word1 not in self.successors or word2 not in self.successors:
+            return
+        succ1 = self.successors[word1]
+        pred2 = self.predecessors[word2]
+        predecessors = self.predecessors
+        if len(succ1) <= len(pred2):
+            for word in succ1:
+                weight2 = pred2.get(word)
+                if weight2 is not None:
+                    yield word, combine(predecessors[word][word1], weight2)
+        else:
+            for word, weight2 in pred2.items():
+                if word in succ1:
+                    yield word, combine(predecessors[word][word1], weight2)
+
+    def ranked(self, word1, word2, k=None, score="product"):
+        # 按得分从高到低的 [(桥接词, 得分)]；单词不在图中时返回 None。
+        # 得分相同时按 word1 出边的顺序排列，与遍历哪一侧无关
+        if word1 not in self.successors or word2 not in self.successors:
+            return None
+        rank = self.successors[word1]
+        ordered = top_bridge_words(((word, (value, -rank[word])) for word, value in self.iter_scored(word1, word2, score)), k)
+        return [(word, value) for word, (value, _) in ordered]
+
+    def weighted_candidates(self, word1, word2, score="product"):
+        # 供按得分加权抽样使用：(桥接词元组, 累计权值元组)，没有桥接词时两者均为空
+        words = []
+        cum_weights = []
+        total = 0
+        for word, value in self.iter_scored(word1, word2, score):
+            total += value
+            words.append(word)
+            cum_weights.append(total)
+        return tuple(words), tuple(cum_weights)
+
+
+# networkx 图中单词的出边序号表 {后继: 序号}，按图版本缓存：{图: (版本号, {单词: 序号表})}
+_out_edge_ranks = weakref.WeakKeyDictionary()
+
+
+def out_edge_rank(graph, word1):
+    # 返回 word -> word 在 word1 出边中的序号。CSRGraph 直接用 edge_position；
+    # networkx 图没有按位置的索引，为每个单词建立一次序号表，图版本变化后重建
+    edge_position = getattr(graph, "edge_position", None)
+    if edge_position is not None:
+        index = graph.index
+        source = index[word1]
+        return lambda word: edge_position(source, index[word])
+    version = graph_version(graph)
+    state = _out_edge_ranks.get(graph)
+    if state is None or state[0] != version:
+        state = _out_edge_ranks[graph] = (version, {})
+    rank = state[1].get(word1)
+    if rank is None:
+        rank = state[1][word1] = {word: i for i, word in enumerate(graph.successors(word1))}
+    return rank.__getitem__
+
+
+def edge_weight_getter(graph):
+    # 返回 (word1, word2) -> 权值（边不存在时为 None）；CSRGraph 提供 edge_weight，不必先构造邻接视图
+    edge_weight = getattr(graph, "edge_weight", None)
+    if edge_weight is not None:
+        return edge_weight
+
+    def get(word1, word2):
+        edge = graph.get_edge_data(word1, word2)
+        return None if edge is None else edge.get('weight', 1)
+    return get
+
+
+def find_bridge_words_batch(graph, pairs):
+    # 批量查询：只建一次索引，随后每个 (word1, word2) 查询都是集合交运算
+    return BridgeWordIndex(graph).query_many(pairs)
+
+
+@instrument.instrumented("find_bridge_words")
+def find_bridge_words(graph, word1, word2):
+    if word1 not in graph or word2 not in graph:
+        return None
+
+    # 桥接词路径长度恰为3，只需检查 word1 的出边与 word2 的入边中较小的一侧，无需枚举所有简单路径
+    if word1 == word2:
+        return []
+    if graph.out_degree(word1) <= graph.in_degree(word2):
+        return [word for word in graph.successors(word1) if graph.has_edge(word, word2)]
+    # 遍历入边得到的桥接词按 word1 出边的顺序重新排列，结果与遍历出边相同
+    words = [word for word in graph.predecessors(word2) if graph.has_edge(word1, word)]
+    if len(words) > 1:
+        words.sort(key=out_edge_rank(graph, word1))
+    return words
+
+
+@instrument.instrumented("rank_bridge_words")
+def rank_bridge_words(graph, word1, word2, k=None, score="product"):
+    # 不建索引的带权查询：按得分从高到低返回前 k 个 (桥接词, 得分)，复杂度与 find_bridge_words 相同；
+    # 得分相同时按 word1 出边的顺序排列，与遍历哪一侧无关
+    combine = get_bridge_score(score)
+    if word1 not in graph or word2 not in graph:
+        return None
+    if word1 == word2:
+        return []
+    edge_weight = edge_weight_getter(graph)
+
+    if graph.out_degree(word1) <= graph.in_degree(word2):
+        def scored():
+            for word, data in graph[word1].items():
+                weight2 = edge_weight(word, word2)
+                if weight2 is not None:
+                    yield word, combine(data.get('weight', 1), weight2)
+        return top_bridge_words(scored(), k)
+
+    candidates = []
+    for word in graph.predecessors(word2):
+        weight1 = edge_weight(word1, word)
+        if weight1 is not None:
+            candidates.append((word, combine(weight1, edge_weight(word, word2))))
+    if len(candidates) > 1:
+        rank = out_edge_rank(graph, word1)
+        candidates.sort(key=lambda item: rank(item[0]))
+    return top_bridge_words(candidates, k)
+
+
+def versioned_lru_cache(graph, func, maxsize):
+    # 以 (图版本号, word1, word2) 为键的 LRU 缓存：图增量更新（版本号加一）后旧结果不再命中，
+    # 随后按 LRU 逐渐淘汰。索引本身仍需由调用方通过 BridgeWordIndex.update 保持最新
+    cached = lru_cache(maxsize=maxsize)(lambda version, word1, word2: func(word1, word2))
+
+    def lookup(word1, word2):
+        return cached(graph_version(graph), word1, word2)
+
+    lookup.cache_info = cached.cache_info
+    lookup.cache_clear = cached.cache_clear
+    return lookup
+
+
+def cached_bridge_lookup(graph, index=None, maxsize=1 << 16):
+    # 基于预计算索引的桥接词查询，并用 LRU 缓存重复出现的词对
+    index = index if index is not None else BridgeWordIndex(graph)
+    return versioned_lru_cache(graph, index.query, maxsize)
+
+
+def weighted_bridge_sampler(graph, index=None, score="product", maxsize=1 << 16):
+    # 按得分加权抽取桥接词：返回 sample(word1, word2, rng)，没有桥接词时返回 None；
+    # 每个词对的候选与累计权值用 LRU 缓存（随图版本号失效），重复出现的词对每次只需 O(log n) 抽样
+    get_bridge_score(score)
+    index = index if index is not None else BridgeWordIndex(graph)
+    candidates = versioned_lru_cache(graph, partial(index.weighted_candidates, score=score), maxsize)
+
+    def sample(word1, word2, rng):
+        words, cum_weights = candidates(word1, word2)
+        if not words:
+            return None
+        return rng.choices(words, cum_weights=cum_weights)[0]
+
+    return sample
+
+
+@instrument.instrumented("generate_by_bridge_words")
+def generate_by_bridge_words(graph, text, rng=None, lookup=None, sampler=None):
+    # rng 可传入 random.Random(seed) 以得到可复现的结果；lookup 为桥接词查询函数，
+    # 桥接词等概率选取。传入 sampler（如 weighted_bridge_sampler 的结果）时改由它选取
+    rng = rng if rng is not None else random
+    if lookup is None:
+        lookup = lambda word1, word2: find_bridge_words(graph, word1, word2)
+
+    cleaned_text = preprocess_text(text)
+    words = cleaned_text.split()
+
+    # 顺序构造新句子：每对相邻词之间若有桥接词则随机插入一个，整体为线性时间
+    new_words = []
+    for i, word in enumerate(words):
+        if i > 0:
+            if sampler is not None:
+                bridge_word = sampler(words[i - 1], word, rng)
+                if bridge_word is not None:
+                    new_words.append(bridge_word)
+            else:
+                bridge_words = lookup(words[i - 1], word)
+                if bridge_words:
+                    new_words.append(rng.choice(bridge_words))
+        new_words.append(word)
+    return new_words
+
+
+@instrument.instrumented("rewrite_lines")
+def rewrite_lines(graph, lines, output, rng=None, lookup=None, sampler=None):
+    # 批量改写：逐行读取并写出，内存占用与输入大小无关
+    if lookup is None and sampler is None:
+        lookup = cached_bridge_lookup(graph)
+    for line in lines:
+        output.write(' '.join(generate_by_bridge_words(graph, line, rng, lookup, sampler)))
+        output.write('\n')
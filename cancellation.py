@@ -0,0 +1,33 @@
+import threading
+
+# 协作式取消：QueryRunner 在工作线程中执行查询时登记该查询的取消事件（threading.Event），
+# 耗时的循环（Dijkstra、最短路径枚举、高亮绘制）取出当前事件并定期检查，
+# 查询被新查询取代或窗口关闭后抛出 QueryCancelled 尽快退出，让出工作线程。
+# 不在 QueryRunner 中运行（如命令行）时没有取消事件，检查只是一次与 None 的比较。
+
+_local = threading.local()
+
+
+class QueryCancelled(Exception):
+    pass
+
+
+def current_event():
+    # 当前线程正在执行的查询的取消事件，没有时为 None
+    return getattr(_local, "event", None)
+
+
+def check(event):
+    if event is not None and event.is_set():
+        raise QueryCancelled()
+
+
+def run_cancellable(event, func, *args):
+    # 登记取消事件后在当前线程中执行 func；开始前就已取消时直接退出
+    previous = current_event()
+    _local.event = event
+    try:
+        check(event)
+        return func(*args)
+    finally:
+        _local.event = previous
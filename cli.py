@@ -0,0 +1,237 @@
+import argparse
+import json
+import random
+
+from bridge_words import (BRIDGE_SCORES, cached_bridge_lookup, find_bridge_words, generate_by_bridge_words, rank_bridge_words,
+                          weighted_bridge_sampler)
+from graph_builder import TOKENIZERS
+from graph_cache import load_or_build_graph
+from graph_export import is_dot_file, restrict_graph, write_dot
+from rewrite import rewrite_file
+from shortest_paths import SINGLE_SOURCE_MAX_PATHS, all_shortest_paths, path_length, single_source_shortest_paths
+import instrument
+import walks
+
+
+# 无界面的命令行入口，适合在没有显示器的服务器上批量运行：
+#   python -m cli graph [--draw directed_graph.png] [--export graph.dot|graph.svg] [--focus WORD...] [--hops K] [--top-n N]
+#   python -m cli bridge WORD1 WORD2 [--ranked] [--top-k K] [--score product|min]
+#   python -m cli generate TEXT... | --file 输入文件 [-o 输出文件] [--weighted [--score product|min]]
+#   python -m cli shortest WORD1 [WORD2] [--draw] [--export paths.dot] [--hops K]
+#   python -m cli walk [--seed 42] [--weighted] [--count N [--workers P]]
+# 只有需要渲染图片的命令（--draw，或导出为 .png/.svg）才会导入 matplotlib，
+# 导出 DOT 文本不需要 matplotlib，全程不导入 tkinter。
+
+
+def print_result(args, data, text):
+    if args.json:
+        print(json.dumps(data, ensure_ascii=False))
+    else:
+        print(text)
+
+
+def export_graph(graph, output_file, paths=None, focus=None, hops=1, top_n=None):
+    # 按扩展名导出：DOT 文本直接写出，其余格式（.png/.svg 等）交给 matplotlib
+    if is_dot_file(output_file):
+        if focus or top_n is not None:
+            graph = restrict_graph(graph, focus, hops, top_n)
+        write_dot(graph, output_file, paths)
+        return
+    from render import draw_and_save_graph, draw_and_save_graph_1
+    if paths is None:
+        draw_and_save_graph(graph, output_file, focus=focus, hops=hops, top_n=top_n)
+    else:
+        draw_and_save_graph_1(graph, paths, output_file, hops=hops if focus else None)
+
+
+def path_focus(paths, hops):
+    # 指定了 --hops 时，以路径上的所有节点为中心裁剪导出的图
+    if hops is None:
+        return None
+    return [word for path in paths for word in path]
+
+
+def command_graph(graph, args):
+    if args.draw:
+        from render import draw_and_save_graph
+        draw_and_save_graph(graph, args.draw)
+    if args.export:
+        focus = [word.lower() for word in args.focus or []]
+        export_graph(graph, args.export, focus=focus, hops=args.hops, top_n=args.top_n)
+
+    edges = [(word1, word2, data.get('weight', 1)) for word1, word2, data in graph.edges(data=True)]
+    print_result(args, {"nodes": list(graph.nodes()), "edges": edges},
+                 f"Nodes: {', '.join(graph.nodes())}\n"
+                 f"Edges: {', '.join(f'{word1}->{word2}({weight})' for word1, word2, weight in edges)}")
+
+
+def command_bridge(graph, args):
+    word1, word2 = args.word1.lower(), args.word2.lower()
+    if args.top_k is not None or args.ranked:
+        command_ranked_bridge(graph, args, word1, word2)
+        return
+    bridge_words = find_bridge_words(graph, word1, word2)
+    if bridge_words is None:
+        text = f"No {word1} or {word2} in the graph!"
+    elif not bridge_words:
+        text = f"No bridge words from {word1} to {word2}!"
+    else:
+        text = f"The bridge words from {word1} to {word2} are: {', '.join(bridge_words)}"
+    print_result(args, {"word1": word1, "word2": word2, "bridge_words": bridge_words}, text)
+
+
+def command_ranked_bridge(graph, args, word1, word2):
+    # 按得分从高到低输出桥接词及其得分
+    ranked = rank_bridge_words(graph, word1, word2, args.top_k, args.score)
+    if ranked is None:
+        text = f"No {word1} or {word2} in the graph!"
+    elif not ranked:
+        text = f"No bridge words from {word1} to {word2}!"
+    else:
+        text = (f"The bridge words from {word1} to {word2} ranked by {args.score} are: "
+                f"{', '.join(f'{word}({value})' for word, value in ranked)}")
+    data = {"word1": word1, "word2": word2, "score": args.score,
+            "bridge_words": None if ranked is None else [{"word": word, "score": value} for word, value in ranked]}
+    print_result(args, data, text)
+
+
+def command_generate(graph, args):
+    rng = random.Random(args.seed)
+    sampler = weighted_bridge_sampler(graph, score=args.score) if args.weighted else None
+    if args.file:
+        # 批量模式：逐行流式改写整个文件，与 python -m rewrite 相同
+        rewrite_file(graph, args.file, args.output, rng, sampler)
+        return
+
+    lookup = None if sampler else cached_bridge_lookup(graph)
+    words = generate_by_bridge_words(graph, ' '.join(args.text), rng, lookup, sampler)
+    sentence = ' '.join(words)
+    print_result(args, {"text": sentence}, f"The new sentence is: {sentence}")
+
+
+def command_shortest(graph, args):
+    word1 = args.word1.lower()
+    if word1 not in graph:
+        print_result(args, {"source": word1, "paths": None}, f"No {word1} in the graph!")
+        return
+
+    if args.word2 is None:
+        # 单源模式：一次 Dijkstra 求出到所有节点的最短路径，每个目标默认只取一条
+        max_paths = args.max_paths if args.max_paths is not None else SINGLE_SOURCE_MAX_PATHS
+        if args.draw:
+            from render import find_shortest_from
+            results = find_shortest_from(graph, word1, max_paths)
+        else:
+            results = single_source_shortest_paths(graph, word1, max_paths=max_paths)
+        if args.export:
+            paths = [path for distance, target_paths in results.values() for path in target_paths]
+            export_graph(graph, args.export, paths, focus=path_focus(paths, args.hops), hops=args.hops)
+        lines = [f"The shortest path from {word1} to {node} is: {', '.join(path)}，len = {len(path)}，distance = {distance}"
+                 for node, (distance, paths) in results.items() for path in paths]
+        data = {"source": word1,
+                "targets": {node: {"distance": distance, "paths": paths} for node, (distance, paths) in results.items()}}
+        print_result(args, data, '\n'.join(lines) or f"No path from {word1}!")
+        return
+
+    word2 = args.word2.lower()
+    if args.draw:
+        from render import find_shortest
+        paths = find_shortest(graph, word1, word2, args.max_paths)
+    else:
+        paths = all_shortest_paths(graph, word1, word2, max_paths=args.max_paths)
+    if args.export and paths:
+        export_graph(graph, args.export, paths, focus=path_focus(paths, args.hops), hops=args.hops)
+    if not paths:
+        print_result(args, {"source": word1, "target": word2, "distance": None, "paths": None},
+                     f"No path from {word1} to {word2}!")
+        return
+    distance = path_length(graph, paths[0])
+    lines = [f"The shortest path from {word1} to {word2} is: {', '.join(path)}，len = {len(path)}，distance = {distance}"
+             for path in paths]
+    print_result(args, {"source": word1, "target": word2, "distance": distance, "paths": paths}, '\n'.join(lines))
+
+
+def command_walk(graph, args):
+    engine = walks.WalkEngine(graph, weighted=args.weighted)
+    if args.count > 1:
+        # 批量模式：逐条写入输出文件，每行一条游走
+        output = args.output or "random_walk.txt"
+        count = walks.write_walks(engine.walks(args.count, args.seed, args.workers), output)
+        print_result(args, {"count": count, "file": output}, f"{count} random walks written to {output}")
+        return
+
+    sentence = ' '.join(engine.walk(random.Random(args.seed)))
+    if args.output:
+        walks.save_walk(sentence, args.output)
+    print_result(args, {"walk": sentence, "file": args.output}, f"The random walk result is: {sentence}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m cli", description="软件工程实验一（命令行版）")
+    parser.add_argument("--input", default="input.txt", help="输入的文本文件路径")
+    parser.add_argument("--tokenizer", default="punctuation", choices=sorted(TOKENIZERS), help="分词规则")
+    parser.add_argument("--rebuild-cache", action="store_true", help="忽略已有的图快照，强制重新建图")
+    parser.add_argument("--json", action="store_true", help="以 JSON 格式输出结果")
+    instrument.add_arguments(parser)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    graph_parser = subparsers.add_parser("graph", help="输出图的节点和边")
+    graph_parser.add_argument("--draw", nargs="?", const="directed_graph.png", default=None,
+                              help="同时把有向图渲染到图片文件")
+    graph_parser.add_argument("--export", help="导出到文件，按扩展名选择格式：.dot/.gv（无需 matplotlib）、.svg、.png")
+    graph_parser.add_argument("--focus", nargs="+", help="只导出这些词的邻域")
+    graph_parser.add_argument("--hops", type=int, default=1, help="配合 --focus 使用的邻域跳数")
+    graph_parser.add_argument("--top-n", type=int, default=None, help="只导出权值最大的 N 条边")
+    graph_parser.set_defaults(handler=command_graph)
+
+    bridge_parser = subparsers.add_parser("bridge", help="查询桥接词")
+    bridge_parser.add_argument("word1")
+    bridge_parser.add_argument("word2")
+    bridge_parser.add_argument("--ranked", action="store_true", help="按得分从高到低输出桥接词及其得分")
+    bridge_parser.add_argument("--top-k", type=int, default=None, help="只输出得分最高的 K 个桥接词（隐含 --ranked）")
+    bridge_parser.add_argument("--score", default="product", choices=sorted(BRIDGE_SCORES),
+                               help="桥接词 b 的得分：w(word1,b) 与 w(b,word2) 之积或较小者")
+    bridge_parser.set_defaults(handler=command_bridge)
+
+    generate_parser = subparsers.add_parser("generate", help="根据桥接词生成新文本")
+    generate_parser.add_argument("text", nargs="*", help="待改写的文本")
+    generate_parser.add_argument("--file", help="逐行改写的输入文件，'-' 表示标准输入")
+    generate_parser.add_argument("-o", "--output", default="-", help="配合 --file 使用的输出文件")
+    generate_parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    generate_parser.add_argument("--weighted", action="store_true", help="按桥接词得分加权选择（默认等概率）")
+    generate_parser.add_argument("--score", default="product", choices=sorted(BRIDGE_SCORES), help="配合 --weighted 使用的得分")
+    generate_parser.set_defaults(handler=command_generate)
+
+    shortest_parser = subparsers.add_parser("shortest", help="查询最短路径，省略 WORD2 时求到所有节点的最短路径")
+    shortest_parser.add_argument("word1")
+    shortest_parser.add_argument("word2", nargs="?")
+    shortest_parser.add_argument("--max-paths", type=int, default=None,
+                                 help="每个目标最多输出的路径条数；省略 WORD2 时默认为 1")
+    shortest_parser.add_argument("--draw", action="store_true", help="同时渲染 shortest_path.png")
+    shortest_parser.add_argument("--export", help="把高亮了最短路径的图导出到文件（.dot/.gv/.svg/.png）")
+    shortest_parser.add_argument("--hops", type=int, default=None, help="导出时只保留路径上各节点的 K 跳邻域")
+    shortest_parser.set_defaults(handler=command_shortest)
+
+    walk_parser = subparsers.add_parser("walk", help="随机游走")
+    walk_parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    walk_parser.add_argument("--output", default="random_walk.txt", help="游走结果写入的文件，传空字符串则不写")
+    walk_parser.add_argument("--weighted", action="store_true", help="按边权重选择下一个节点（默认等概率）")
+    walk_parser.add_argument("--count", type=int, default=1, help="生成的游走条数，大于 1 时逐行写入 --output")
+    walk_parser.add_argument("--workers", type=int, default=None, help="批量游走使用的进程数")
+    walk_parser.set_defaults(handler=command_walk)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    instrument.configure(args)
+    try:
+        graph = load_or_build_graph(args.input, rebuild=args.rebuild_cache, tokenizer=args.tokenizer)
+        args.handler(graph, args)
+    finally:
+        instrument.finish(args)
+
+
+if __name__ == "__main__":
+    main()
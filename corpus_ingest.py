@@ -0,0 +1,305 @@
+import argparse
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, chain, compress, repeat
+from operator import add, and_, eq, lshift, or_, rshift
+
+import instrument
+from csr_graph import CSRGraph
+from graph_builder import (CHUNK_SIZE, EDGE_KEY_BITS, EDGE_KEY_MASK, EdgeCounter, get_tokenizer, graph_from_edge_arrays,
+                           iter_words, read_chunks)
+
+
+# 多文件语料的并行建图：文件按顺序切分成若干连续的批次，全部重活都在进程池中分四轮完成：
+#   1. 计数    每个批次逐个文件分词计数，得到紧凑的计数表，并统计各词的出度与入度
+#   2. 分片    主进程确定全局节点编号和按源节点编号划分的连续区间（每个区间的边数大致相等）；
+#              每个批次把自己的边换成全局编号，按源节点所属区间切分
+#   3. 归约    每个区间收集各批次的分片并累加权值，直接得到该区间内节点的 CSR 出边行，
+#              同时把边按 (目标, 源) 排序并按目标节点所属区间切分，供下一轮使用
+#   4. 前驱    每个目标区间归并各片段，得到该区间的前驱 CSR 行
+# 主进程最后只把各区间的数组按顺序拼接（C 层的内存复制），不再有串行的合并或建图。
+# 仍然串行的部分：确定全局节点编号（与各批次的词表大小成正比，远小于边数）、
+# 在进程间转发数组，以及 csr=False 时转换为 networkx 图（networkx 本身只能逐条加边）。
+# 代价是四轮的总工作量约为串行建图的两倍（重新编号、分片与各轮之间的复制），
+# 因此 N 个核心上的加速比约为 N / 2，而不是 N；只有一个核心时请用 workers=1。
+# 计数表为 (词表, 打包边键数组, 权值数组, 最后一个词的编号)：单词按首次出现的顺序编号，
+# 边 (src, dst) 打包为 src << EDGE_KEY_BITS | dst（与 graph_builder.EdgeCounter 相同），
+# 数组以字节形式序列化，传输和解码都很快。第一个词的编号总是 0（词表非空时）。
+# 各批次的分片按文件顺序送入归约，先出现的边先插入计数字典，因此每个节点的出边顺序、
+# 节点编号（首次出现在边中的顺序）都与串行建图相同。
+# cross_documents=True 时，上一个文件的最后一个词与下一个文件的第一个词也构成一条边，
+# 结果与对 "\n".join(各文件文本) 串行建图相同；为 False 时，每个文件视为独立的文档，
+# 不产生跨文档的边。前驱按源节点编号排列（与 CSRGraph 和快照一致），csr=False 时由
+# CSRGraph.to_networkx 转换，networkx 图的前驱顺序同样如此。
+# 运行方式：python -m corpus_ingest 目录或文件... [--workers N] [--no-cross-documents] [--snapshot 输出文件]
+
+# 每个工作进程分到的批次数：多于 1 可以平衡各批次耗时不均的情况
+BATCHES_PER_WORKER = 2
+
+
+def iter_corpus_files(paths, suffix=".txt"):
+    # 展开目录（递归，按路径排序），文件按给定顺序保留
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, subdirectories, files in os.walk(path):
+                subdirectories.sort()
+                for name in sorted(files):
+                    if name.endswith(suffix):
+                        yield os.path.join(directory, name)
+        else:
+            yield path
+
+
+def count_files(paths, tokenizer=None, chunk_size=CHUNK_SIZE, cross_documents=True):
+    # 按顺序统计若干文件，返回计数表；空文件不影响前后文件的衔接
+    counter = EdgeCounter()
+    last_id = None
+    for path in paths:
+        if not cross_documents:
+            counter.previous_id = None
+        with open(path, "r") as file:
+            counter.update(iter_words(read_chunks(file, chunk_size), tokenizer))
+        if counter.previous_id is not None:
+            last_id = counter.previous_id
+    vocab, keys, weights = counter.packed_counts()
+    return vocab, keys, weights, last_id
+
+
+def edge_node_order(sources, targets):
+    # 节点首次出现在边中的顺序（编号列表）
+    return list(dict.fromkeys(chain.from_iterable(zip(sources, targets))))
+
+
+def table_edge_arrays(table, cross_documents=True):
+    # 计数表 -> (词表, 源节点数组, 目标节点数组, 权值数组)，可直接交给 CSRGraph.from_edge_arrays
+    vocab, keys, weights, _ = table
+    sources = array('i', map(rshift, keys, repeat(EDGE_KEY_BITS)))
+    targets = array('i', map(and_, keys, repeat(EDGE_KEY_MASK)))
+    weights = array('i', weights)
+    if not sources:
+        return [], sources, targets, weights
+    if not cross_documents:
+        # 各文档独立时，某个词可能先出现在只有一种词的文档里（不在任何边上），
+        # 词表顺序与节点首次出现在边中的顺序不同，按边的顺序重新编号
+        order = edge_node_order(sources, targets)
+        if len(order) != len(vocab) or order != list(range(len(order))):
+            new_id = dict(zip(order, range(len(order))))
+            vocab = [vocab[word_id] for word_id in order]
+            sources = array('i', map(new_id.__getitem__, sources))
+            targets = array('i', map(new_id.__getitem__, targets))
+    return vocab, sources, targets, weights
+
+
+def split_batches(files, batch_count):
+    # 按文件大小切分成 batch_count 个连续的批次
+    sizes = [os.path.getsize(path) for path in files]
+    target = sum(sizes) / batch_count if batch_count else 0
+    batches = [[]]
+    size = 0
+    for path, file_size in zip(files, sizes):
+        if batches[-1] and size >= target * len(batches) and len(batches) < batch_count:
+            batches.append([])
+        batches[-1].append(path)
+        size += file_size
+    return batches
+
+
+def _count_batch_task(task):
+    # 第 1 轮：计数表，外加各词首次出现在边中的顺序与度数（出度 + 入度，按本批次的编号）
+    vocab, keys, weights, last_id = count_files(*task)
+    sources = array('i', map(rshift, keys, repeat(EDGE_KEY_BITS)))
+    targets = array('i', map(and_, keys, repeat(EDGE_KEY_MASK)))
+    counted = Counter(sources)
+    counted.update(targets)
+    degrees = array('i', map(counted.__getitem__, range(len(vocab))))
+    return (vocab, keys, weights, last_id), array('i', edge_node_order(sources, targets)), degrees
+
+
+def plan_nodes(counted, cross_documents=True):
+    # 全局节点编号：各词首次出现在边中的顺序。跨文档的边 (上一批次的最后一个词, 本批次的第一个词)
+    # 出现在本批次的所有边之前。返回 (词表, 各批次的 本地编号 -> 全局编号 数组, 各批次开头的跨文档边)
+    order = []
+    boundaries = []
+    previous_word = None
+    for (vocab, keys, weights, last_id), edge_nodes, degrees in counted:
+        boundary = None
+        if vocab and cross_documents and previous_word is not None and previous_word != vocab[0]:
+            boundary = (previous_word, vocab[0])
+            order.extend(boundary)
+        boundaries.append(boundary)
+        order.extend(map(vocab.__getitem__, edge_nodes))
+        if last_id is not None:
+            previous_word = vocab[last_id]
+
+    vocab = list(dict.fromkeys(order))
+    index = dict(zip(vocab, range(len(vocab))))
+    remaps = [array('i', map(index.get, table[0], repeat(-1))) for table, edge_nodes, degrees in counted]
+    boundaries = [boundary and (index[boundary[0]], index[boundary[1]]) for boundary in boundaries]
+    return vocab, remaps, boundaries
+
+
+def plan_ranges(counted, remaps, node_count, shard_count):
+    # 按估计的度数（各批次之和，重复的边会被多算）把节点编号切成 shard_count 个连续区间，
+    # 各区间的出边与入边大致相等，源区间和目标区间共用同一划分。返回区间的右端点
+    estimate = array('q', bytes(8 * node_count))
+    for (table, edge_nodes, degrees), remap in zip(counted, remaps):
+        for node_id, degree in zip(remap, degrees):
+            if degree:
+                estimate[node_id] += degree
+    total = sum(estimate)
+    bounds = []
+    cumulative = 0
+    for node_id, degree in enumerate(estimate):
+        cumulative += degree
+        if cumulative * shard_count >= total * (len(bounds) + 1) and len(bounds) < shard_count - 1:
+            bounds.append(node_id + 1)
+    bounds.extend([node_count] * (shard_count - len(bounds)))
+    return bounds
+
+
+def split_by_range(bounds, key_ids, *columns):
+    # 按 key_ids 所在的区间把各列拆成 len(bounds) 份，每份内保持原有顺序
+    shards = array('i', map(bisect_right, repeat(bounds), key_ids))
+    pieces = []
+    for shard in range(len(bounds)):
+        selected = bytes(map(eq, shards, repeat(shard)))
+        pieces.append(tuple(array(column.typecode, compress(column, selected)) for column in columns))
+    return pieces
+
+
+def _partition_task(task):
+    # 第 2 轮：把一个批次的边换成全局编号（跨文档的边排在最前），按源节点所在区间切分；
+    # 每片为 (打包边键数组, 权值数组)
+    keys, weights, remap, boundary, bounds = task
+    sources = array('i', map(remap.__getitem__, map(rshift, keys, repeat(EDGE_KEY_BITS))))
+    targets = map(remap.__getitem__, map(and_, keys, repeat(EDGE_KEY_MASK)))
+    keys = array('q', map(or_, map(lshift, sources, repeat(EDGE_KEY_BITS)), targets))
+    if boundary is not None:
+        sources.insert(0, boundary[0])
+        keys.insert(0, boundary[0] << EDGE_KEY_BITS | boundary[1])
+        weights = array('q', chain((1,), weights))
+    return split_by_range(bounds, sources, keys, weights)
+
+
+def _reduce_task(task):
+    # 第 3 轮：累加一个源节点区间 [start, end) 的边，得到这些节点的 CSR 出边行。
+    # 分片按批次顺序到达，每行字典的插入顺序就是边首次出现的顺序
+    pieces, start, end, target_bounds = task
+    rows = {}
+    get_row = rows.get
+    for keys, weights in pieces:
+        sources = map(rshift, keys, repeat(EDGE_KEY_BITS))
+        targets = map(and_, keys, repeat(EDGE_KEY_MASK))
+        for source, target, weight in zip(sources, targets, weights):
+            row = get_row(source)
+            if row is None:
+                row = rows[source] = {}
+            row[target] = row.get(target, 0) + weight
+
+    offsets = array('i', [0])
+    targets = array('i')
+    weights = array('i')
+    row_sources = array('i')
+    empty = {}
+    for source in range(start, end):
+        row = get_row(source, empty)
+        targets.extend(row.keys())
+        weights.extend(row.values())
+        row_sources.extend(repeat(source, len(row)))
+        offsets.append(len(targets))
+
+    # 前驱：把 (目标, 源) 打包为一个整数并排序，即按目标、再按源节点编号排列；
+    # 按目标节点所在区间切成有序的片段，供第 4 轮归并
+    packed = sorted(map(or_, map(lshift, targets, repeat(EDGE_KEY_BITS)), row_sources))
+    cuts = [0] + [bisect_left(packed, bound << EDGE_KEY_BITS) for bound in target_bounds]
+    return (offsets, targets, weights), [array('q', packed[cuts[i]:cuts[i + 1]]) for i in range(len(target_bounds))]
+
+
+def _predecessor_task(task):
+    # 第 4 轮：归并各源区间的有序片段，得到一个目标节点区间 [start, end) 的前驱 CSR 行；
+    # 每个节点的前驱按源节点编号排列，与 CSRGraph._build_predecessors 相同
+    pieces, start, end = task
+    packed = sorted(chain.from_iterable(pieces))
+    degrees = Counter(map(rshift, packed, repeat(EDGE_KEY_BITS)))
+    offsets = array('i', accumulate(map(degrees.__getitem__, range(start, end)), initial=0))
+    return offsets, array('i', map(and_, packed, repeat(EDGE_KEY_MASK)))
+
+
+def concat_rows(parts):
+    # 把各区间的 (局部偏移数组, 数组...) 按顺序拼接为完整的 CSR 数组
+    offsets = array('i', [0])
+    columns = [array('i') for _ in parts[0][1:]]
+    for part_offsets, *part_columns in parts:
+        offsets.extend(map(add, part_offsets[1:], repeat(offsets[-1])))
+        for column, part_column in zip(columns, part_columns):
+            column.extend(part_column)
+    return (offsets, *columns)
+
+
+def parallel_csr(executor, files, workers, tokenizer, chunk_size, cross_documents):
+    tasks = [(batch, tokenizer, chunk_size, cross_documents)
+             for batch in split_batches(files, workers * BATCHES_PER_WORKER)]
+    counted = list(executor.map(_count_batch_task, tasks))
+
+    vocab, remaps, boundaries = plan_nodes(counted, cross_documents)
+    node_count = len(vocab)
+    bounds = plan_ranges(counted, remaps, node_count, workers)
+    starts = [0] + bounds[:-1]
+
+    partitions = list(executor.map(_partition_task, [
+        (keys, weights, remap, boundary, bounds)
+        for ((_, keys, weights, _), _, _), remap, boundary in zip(counted, remaps, boundaries)]))
+    del counted
+    reduced = list(executor.map(_reduce_task, [
+        ([partition[shard] for partition in partitions], start, end, bounds)
+        for shard, (start, end) in enumerate(zip(starts, bounds))]))
+    del partitions
+    predecessors = list(executor.map(_predecessor_task, [
+        ([pred_pieces[shard] for rows, pred_pieces in reduced], start, end)
+        for shard, (start, end) in enumerate(zip(starts, bounds))]))
+
+    offsets, targets, weights = concat_rows([rows for rows, pred_pieces in reduced])
+    pred_offsets, pred_sources = concat_rows(predecessors)
+    return CSRGraph(vocab, offsets, targets, weights, pred_offsets, pred_sources)
+
+
+@instrument.instrumented("ingest_corpus")
+def ingest_corpus(paths, workers=None, cross_documents=True, tokenizer=None, chunk_size=CHUNK_SIZE, csr=False):
+    # paths 为文件或目录列表；workers 为 1 时在当前进程中串行计数
+    files = list(iter_corpus_files(paths))
+    tokenizer = get_tokenizer(tokenizer).name
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(files) <= 1:
+        edge_arrays = table_edge_arrays(count_files(files, tokenizer, chunk_size, cross_documents), cross_documents)
+        if csr:
+            return CSRGraph.from_edge_arrays(*edge_arrays)
+        return graph_from_edge_arrays(*edge_arrays)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        graph = parallel_csr(executor, files, workers, tokenizer, chunk_size, cross_documents)
+    return graph if csr else graph.to_networkx()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m corpus_ingest", description="多文件语料并行建图")
+    parser.add_argument("paths", nargs="+", help="语料文件或目录（目录中的 .txt 文件按路径排序）")
+    parser.add_argument("--workers", type=int, default=None, help="工作进程数，默认为 CPU 核数")
+    parser.add_argument("--no-cross-documents", action="store_true", help="不统计跨文档的相邻词")
+    parser.add_argument("--tokenizer", default="punctuation", help="分词规则")
+    parser.add_argument("--snapshot", help="把图保存为快照文件，可用 graph_cache.load_graph 加载")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    graph = ingest_corpus(args.paths, args.workers, not args.no_cross_documents, args.tokenizer, csr=True)
+    print(f"Nodes: {graph.number_of_nodes()}, Edges: {graph.number_of_edges()}")
+    if args.snapshot:
+        from graph_cache import save_graph
+        save_graph(graph, args.snapshot)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+import sys
+from array import array
+from collections.abc import Mapping
+
+# 出度不超过该值的行直接顺序查找边；更大的行首次查找时建立 目标编号 -> 位置 的字典
+ROW_SCAN_LIMIT = 16
+
+
+# 某个节点出边的只读视图，行为与 networkx 的 graph[node] 一致：neighbor -> {'weight': w}
+class _AdjacencyView(Mapping):
+    def __init__(self, graph, node_id):
+        self._graph = graph
+        self._node_id = node_id
+        self._start = graph.offsets[node_id]
+        self._end = graph.offsets[node_id + 1]
+
+    def __getitem__(self, word):
+        graph = self._graph
+        target = graph.index.get(word)
+        if target is not None:
+            position = graph.edge_position(self._node_id, target)
+            if position is not None:
+                return {'weight': graph.weights[position]}
+        raise KeyError(word)
+
+    def __iter__(self):
+        vocab = self._graph.vocab
+        for target in self._graph.targets[self._start:self._end]:
+            yield vocab[target]
+
+    def __len__(self):
+        return self._end - self._start
+
+    def items(self):
+        graph = self._graph
+        for i in range(self._start, self._end):
+            yield graph.vocab[graph.targets[i]], {'weight': graph.weights[i]}
+
+
+# 压缩稀疏行（CSR）存储的有向带权图：
+# 单词映射为整数编号，第 i 个节点的出边为 targets[offsets[i]:offsets[i + 1]]，
+# 对应权值在 weights 中；前驱同样以 CSR 形式存放在 pred_offsets / pred_sources 中。
+# 提供查询函数用到的 networkx.DiGraph 接口子集，出边顺序与原图一致。
+class CSRGraph:
+    def __init__(self, vocab, offsets, targets, weights, pred_offsets=None, pred_sources=None):
+        # 数组既可以是 array('i')，也可以是 mmap 上 cast('i') 得到的 memoryview
+        self.graph = {}  # 图属性，与 networkx 的 graph.graph 对应（如版本号）
+        self.vocab = vocab
+        self.index = {word: i for i, word in enumerate(vocab)}
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        if pred_offsets is None:
+            pred_offsets, pred_sources = self._build_predecessors()
+        self.pred_offsets = pred_offsets
+        self.pred_sources = pred_sources
+        self._rows = {}  # 源节点编号 -> {目标编号: 边的位置}，只为出度大的行按需建立
+
+    def _build_predecessors(self):
+        # 计数排序：先统计每个节点的入度，再按源节点编号依次填入
+        node_count = len(self.vocab)
+        pred_offsets = array('i', bytes(4 * (node_count + 1)))
+        for target in self.targets:
+            pred_offsets[target + 1] += 1
+        for i in range(node_count):
+            pred_offsets[i + 1] += pred_offsets[i]
+
+        pred_sources = array('i', bytes(4 * len(self.targets)))
+        cursor = array('i', pred_offsets[:-1])
+        for source in range(node_count):
+            for i in range(self.offsets[source], self.offsets[source + 1]):
+                target = self.targets[i]
+                pred_sources[cursor[target]] = source
+                cursor[target] += 1
+        return pred_offsets, pred_sources
+
+    @classmethod
+    def from_edge_weights(cls, edge_weights):
+        # 节点编号按首次出现的顺序分配，与 graph_from_edge_weights 构造的图一致
+        vocab = []
+        index = {}
+        sources = array('i')
+        targets = array('i')
+        weights = array('i')
+        for (current_word, next_word), weight in edge_weights.items():
+            for word in (current_word, next_word):
+                if word not in index:
+                    index[word] = len(vocab)
+                    vocab.append(sys.intern(word))
+            sources.append(index[current_word])
+            targets.append(index[next_word])
+            weights.append(weight)
+        return cls.from_edge_arrays(vocab, sources, targets, weights)
+
+    @classmethod
+    def from_networkx(cls, graph, weight='weight'):
+        vocab = [sys.intern(word) for word in graph.nodes()]
+        index = {word: i for i, word in enumerate(vocab)}
+        offsets = array('i', [0])
+        targets = array('i')
+        weights = array('i')
+        for word in vocab:
+            for neighbor, data in graph[word].items():
+                targets.append(index[neighbor])
+                weights.append(data.get(weight, 1))
+            offsets.append(len(targets))
+        return cls(vocab, offsets, targets, weights)
+
+    @classmethod
+    def from_edge_arrays(cls, vocab, sources, targets, weights):
+        # sources / targets 为节点编号数组（如 graph_builder.count_edge_arrays 的结果）；
+        # 按源节点稳定地分桶，保持每个节点出边的原有顺序
+        node_count = len(vocab)
+        offsets = array('i', bytes(4 * (node_count + 1)))
+        for source in sources:
+            offsets[source + 1] += 1
+        for i in range(node_count):
+            offsets[i + 1] += offsets[i]
+
+        sorted_targets = array('i', bytes(4 * len(targets)))
+        sorted_weights = array('i', bytes(4 * len(weights)))
+        cursor = array('i', offsets[:-1])
+        for source, target, weight in zip(sources, targets, weights):
+            position = cursor[source]
+            sorted_targets[position] = target
+            sorted_weights[position] = weight
+            cursor[source] += 1
+        return cls(vocab, offsets, sorted_targets, sorted_weights)
+
+    def to_networkx(self):
+        # 转换回 networkx.DiGraph，供绘图使用
+        import networkx as nx  # 延迟导入：从快照加载图、只做文本查询时用不到 networkx
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self.vocab)
+        for source, word in enumerate(self.vocab):
+            for i in range(self.offsets[source], self.offsets[source + 1]):
+                graph.add_edge(word, self.vocab[self.targets[i]], weight=self.weights[i])
+        return graph
+
+    # ---------- 按整数编号访问，供性能敏感的算法使用 ----------
+    def successor_ids(self, node_id):
+        return self.targets[self.offsets[node_id]:self.offsets[node_id + 1]]
+
+    def successor_weights(self, node_id):
+        return self.weights[self.offsets[node_id]:self.offsets[node_id + 1]]
+
+    def edge_position(self, source, target):
+        # 边 (source, target) 在 targets / weights 中的位置，不存在时返回 None；
+        # 行保持原有的出边顺序，出度大的行借助按需建立的字典做到 O(1)
+        start = self.offsets[source]
+        end = self.offsets[source + 1]
+        if end - start <= ROW_SCAN_LIMIT:
+            for i in range(start, end):
+                if self.targets[i] == target:
+                    return i
+            return None
+        row = self._rows.get(source)
+        if row is None:
+            row = self._rows[source] = dict(zip(self.targets[start:end], range(start, end)))
+        return row.get(target)
+
+    def predecessor_ids(self, node_id):
+        return self.pred_sources[self.pred_offsets[node_id]:self.pred_offsets[node_id + 1]]
+
+    # ---------- networkx.DiGraph 兼容接口 ----------
+    def __contains__(self, word):
+        return word in self.index
+
+    def __iter__(self):
+        return iter(self.vocab)
+
+    def __len__(self):
+        return len(self.vocab)
+
+    def __getitem__(self, word):
+        return _AdjacencyView(self, self.index[word])
+
+    def nodes(self):
+        return self.vocab
+
+    def has_node(self, word):
+        return word in self.index
+
+    def number_of_nodes(self):
+        return len(self.vocab)
+
+    def number_of_edges(self):
+        return len(self.targets)
+
+    def successors(self, word):
+        vocab = self.vocab
+        return (vocab[target] for target in self.successor_ids(self.index[word]))
+
+    neighbors = successors
+
+    def predecessors(self, word):
+        vocab = self.vocab
+        return (vocab[source] for source in self.predecessor_ids(self.index[word]))
+
+    def out_degree(self, word):
+        node_id = self.index[word]
+        return self.offsets[node_id + 1] - self.offsets[node_id]
+
+    def in_degree(self, word):
+        node_id = self.index[word]
+        return self.pred_offsets[node_id + 1] - self.pred_offsets[node_id]
+
+    def has_edge(self, word1, word2):
+        source = self.index.get(word1)
+        target = self.index.get(word2)
+        if source is None or target is None:
+            return False
+        return self.edge_position(source, target) is not None
+
+    def edge_weight(self, word1, word2, default=None):
+        source = self.index.get(word1)
+        target = self.index.get(word2)
+        if source is None or target is None:
+            return default
+        position = self.edge_position(source, target)
+        return default if position is None else self.weights[position]
+
+    def get_edge_data(self, word1, word2, default=None):
+        try:
+            return self[word1][word2]
+        except KeyError:
+            return default
+
+    def out_edges(self, word):
+        return [(word, neighbor) for neighbor in self.successors(word)]
+
+    def edges(self, data=False):
+        vocab = self.vocab
+        for source, word in enumerate(vocab):
+            for i in range(self.offsets[source], self.offsets[source + 1]):
+                if data:
+                    yield word, vocab[self.targets[i]], {'weight': self.weights[i]}
+                else:
+                    yield word, vocab[self.targets[i]]
@@ -0,0 +1,225 @@
+import re
+import string
+from array import array
+from collections import Counter
+from itertools import islice, repeat
+from operator import and_, lshift, or_, rshift
+
+import instrument
+
+# 流式读取时每次读取的字符数
+CHUNK_SIZE = 1 << 20
+
+# 批量统计二元组时每批的单词数
+COUNT_BATCH_SIZE = 1 << 16
+
+# 打包边键时目标节点编号所占的位数：键 = 源节点编号 << EDGE_KEY_BITS | 目标节点编号
+EDGE_KEY_BITS = 32
+EDGE_KEY_MASK = (1 << EDGE_KEY_BITS) - 1
+
+# 标点替换为空格的转换表，只需构造一次
+TRANSLATION_TABLE = str.maketrans(string.punctuation, ' ' * len(string.punctuation))
+
+# 字节级转换表：只保留小写 ASCII 字母，其余字节替换为空格
+ASCII_LETTER_TABLE = bytes(byte if ord('a') <= byte <= ord('z') else ord(' ') for byte in range(256))
+
+
+@instrument.instrumented("preprocess_text")
+def preprocess_text(text):
+    # 替换非字母字符为空格
+    cleaned_text = text.translate(TRANSLATION_TABLE)
+    return cleaned_text.lower()
+
+
+# 可配置的分词器：
+#   punctuation  原有规则，只把 ASCII 标点替换为空格，数字、Unicode 标点等会保留在词中
+#   ascii        只保留 ASCII 字母，其余字符均为分隔符
+#   unicode      保留 Unicode 字母（\w 去掉数字和下划线）
+class Tokenizer:
+    PATTERNS = {
+        "punctuation": None,
+        "ascii": r"[a-z]+",
+        "unicode": r"[^\W\d_]+",
+    }
+
+    def __init__(self, name="punctuation"):
+        if name not in self.PATTERNS:
+            raise ValueError(f"Unknown tokenizer: {name}")
+        self.name = name
+        pattern = self.PATTERNS[name]
+        self._pattern = re.compile(pattern) if pattern else None
+
+    def tokenize(self, text):
+        if self._pattern is None:
+            return preprocess_text(text).split()
+        if self.name == "ascii":
+            # 非 ASCII 字符先编码为 '?'，再与其它非字母字节一起替换为空格，比正则更快，结果相同
+            return text.lower().encode("ascii", "replace").translate(ASCII_LETTER_TABLE).decode("ascii").split()
+        return self._pattern.findall(text.lower())
+
+    def is_word_char(self, char):
+        # 判断字符是否会成为单词的一部分，用于流式分词时识别被截断的词
+        if self._pattern is None:
+            return not (char.isspace() or char in string.punctuation)
+        return self._pattern.fullmatch(char.lower()) is not None
+
+
+TOKENIZERS = {name: Tokenizer(name) for name in Tokenizer.PATTERNS}
+
+
+def get_tokenizer(tokenizer=None):
+    # 接受分词器名称或 Tokenizer 对象，默认使用原有的标点规则
+    if tokenizer is None:
+        return TOKENIZERS["punctuation"]
+    if isinstance(tokenizer, str):
+        if tokenizer not in TOKENIZERS:
+            raise ValueError(f"Unknown tokenizer: {tokenizer}")
+        return TOKENIZERS[tokenizer]
+    return tokenizer
+
+
+def iter_words(chunks, tokenizer=None):
+    # 逐块分词：块末尾不是分隔符时最后一个词可能被截断，留到下一块开头拼接
+    tokenizer = get_tokenizer(tokenizer)
+    tail = ''
+    for chunk in chunks:
+        if not chunk:
+            continue
+        words = tokenizer.tokenize(tail + chunk)
+        tail = words.pop() if tokenizer.is_word_char(chunk[-1]) else ''
+        yield from words
+    if tail:
+        yield tail
+
+
+def read_chunks(file, chunk_size=CHUNK_SIZE):
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def count_edge_weights(words, previous_word=None):
+    # 统计每对相邻单词出现的次数：按批把 words 与 words[1:] 配对交给 Counter 在 C 层计数，
+    # 批与批之间只保留上一个词，内存只与词表和边数有关
+    # previous_word 为前一段文本的最后一个词，用于把跨段的相邻词也计入
+    edge_weights = Counter()
+    words = iter(words)
+    while True:
+        batch = list(islice(words, COUNT_BATCH_SIZE))
+        if not batch:
+            break
+        if previous_word is not None:
+            edge_weights.update(zip([previous_word], batch))
+        edge_weights.update(zip(batch, batch[1:]))
+        previous_word = batch[-1]
+
+    # 排除自环；删除不改变其余边首次出现的顺序
+    for edge in [edge for edge in edge_weights if edge[0] == edge[1]]:
+        del edge_weights[edge]
+    return edge_weights
+
+
+class _WordIndex(dict):
+    # 单词 -> 编号，新词按首次出现的顺序编号；命中时查找完全在 C 层完成
+    def __missing__(self, word):
+        word_id = self[word] = len(self)
+        return word_id
+
+
+# 省内存的二元组计数：单词映射为整数编号，边 (src, dst) 打包为一个整数键
+# src << EDGE_KEY_BITS | dst。与以 (str, str) 元组为键的 Counter 相比，每条边省去一个元组，
+# 整数键也不受循环垃圾回收跟踪；编号、打包与计数都通过 map 在 C 层完成。
+# 计数结束后由 edge_arrays() 转换为紧凑的数组并释放计数表，建图时不再同时存在两份完整的边集。
+class EdgeCounter:
+    def __init__(self):
+        self.index = _WordIndex()
+        self.counts = Counter()
+        self.previous_id = None
+
+    def update(self, words):
+        # 可以多次调用，跨调用的相邻词同样计入
+        index = self.index
+        words = iter(words)
+        while True:
+            batch = list(islice(words, COUNT_BATCH_SIZE))
+            if not batch:
+                break
+            ids = list(map(index.__getitem__, batch))
+            if self.previous_id is not None:
+                ids.insert(0, self.previous_id)
+            self.counts.update(map(or_, map(lshift, ids, repeat(EDGE_KEY_BITS)), islice(ids, 1, None)))
+            self.previous_id = ids[-1]
+        return self
+
+    def _take_counts(self):
+        # 取出计数表并排除自环；删除不改变其余边首次出现的顺序
+        counts = self.counts
+        self.counts = Counter()
+        for word_id in range(len(self.index)):
+            counts.pop(word_id << EDGE_KEY_BITS | word_id, None)
+        return counts
+
+    def packed_counts(self):
+        # 返回 (词表, 打包边键数组, 权值数组)，供合并多个计数结果使用；
+        # 词表保留全部出现过的词（包括不在任何边上的词），编号即首次出现的顺序
+        counts = self._take_counts()
+        return list(self.index), array('q', counts.keys()), array('q', counts.values())
+
+    def edge_arrays(self):
+        # 返回 (词表, 源节点数组, 目标节点数组, 权值数组)，边按首次出现的顺序排列。
+        # 只要出现过两个不同的词，每个词都在某条非自环边上，且各词首次出现在边中的顺序
+        # 就是编号的顺序，因此词表与 graph_from_edge_weights 的节点顺序一致
+        counts = self._take_counts()
+        keys = counts.keys()
+        sources = array('i', map(rshift, keys, repeat(EDGE_KEY_BITS)))
+        targets = array('i', map(and_, keys, repeat(EDGE_KEY_MASK)))
+        weights = array('i', counts.values())
+        vocab = list(self.index) if sources else []
+        return vocab, sources, targets, weights
+
+
+def count_edge_arrays(words):
+    return EdgeCounter().update(words).edge_arrays()
+
+
+def graph_from_edge_weights(edge_weights):
+    import networkx as nx  # 延迟导入：从快照加载图、只做文本查询时用不到 networkx
+    # 创建有向图并添加节点和边
+    graph = nx.DiGraph()
+    for (current_word, next_word), weight in edge_weights.items():
+        graph.add_edge(current_word, next_word, weight=weight)
+    return graph
+
+
+def graph_from_edge_arrays(vocab, sources, targets, weights):
+    import networkx as nx  # 延迟导入：从快照加载图、只做文本查询时用不到 networkx
+    graph = nx.DiGraph()
+    graph.add_weighted_edges_from(zip(map(vocab.__getitem__, sources), map(vocab.__getitem__, targets), weights))
+    return graph
+
+
+@instrument.instrumented("build_directed_graph")
+def build_directed_graph(text, tokenizer=None):
+    words = get_tokenizer(tokenizer).tokenize(text)
+    graph = graph_from_edge_arrays(*count_edge_arrays(words))
+    instrument.record_graph_size("graph", graph)
+    return graph
+
+
+@instrument.instrumented("build_directed_graph_streaming")
+def build_directed_graph_streaming(source, chunk_size=CHUNK_SIZE, tokenizer=None):
+    # source 可以是文件路径、已打开的文件对象，或任意产生文本行（保留换行符）的可迭代对象
+    if isinstance(source, str):
+        with open(source, "r") as file:
+            return graph_from_chunks(read_chunks(file, chunk_size), tokenizer)
+    if hasattr(source, "read"):
+        return graph_from_chunks(read_chunks(source, chunk_size), tokenizer)
+    return graph_from_chunks(source, tokenizer)
+
+
+def graph_from_chunks(chunks, tokenizer=None):
+    graph = graph_from_edge_arrays(*count_edge_arrays(iter_words(chunks, tokenizer)))
+    instrument.record_graph_size("graph", graph)
+    return graph
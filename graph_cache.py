@@ -0,0 +1,127 @@
+import glob
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+import instrument
+from csr_graph import CSRGraph
+from graph_builder import CHUNK_SIZE, count_edge_arrays, get_tokenizer, iter_words, read_chunks
+
+# 图快照的缓存目录
+CACHE_DIR = ".graph_cache"
+
+# 快照文件格式：
+#   头部  MAGIC | 格式版本 | 字节序 | 节点数 | 边数 | 词表字节数
+#   词表  以 '\n' 分隔的 UTF-8 单词（单词中不含空白），补齐到 4 字节对齐
+#   数组  offsets(n + 1) | targets(m) | weights(m) | pred_offsets(n + 1) | pred_sources(m)，均为 int32
+MAGIC = b"LAB1GRPH"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIIIIQ")
+BYTEORDER = {"little": 0, "big": 1}[sys.byteorder]
+
+def preprocess_settings(tokenizer=None):
+    # 影响建图结果的预处理设置，变化后缓存自动失效
+    return {"tokenizer": get_tokenizer(tokenizer).name, "self_loops": False}
+
+
+def cache_key(input_file, settings=None):
+    # 缓存键：语料内容的 sha256 + 预处理设置 + 快照格式版本
+    digest = hashlib.sha256()
+    with open(input_file, "rb") as file:
+        for block in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(block)
+    digest.update(json.dumps(settings or preprocess_settings(), sort_keys=True).encode())
+    digest.update(str(FORMAT_VERSION).encode())
+    return digest.hexdigest()
+
+
+def snapshot_prefix(input_file, settings, cache_dir=CACHE_DIR):
+    # 同一语料（按绝对路径区分）在同一组预处理设置下的快照共用一个前缀：
+    # 文件名相同的不同语料、或换用其他分词器时各有各的快照，互不删除
+    digest = hashlib.sha256(os.path.abspath(input_file).encode())
+    digest.update(json.dumps(settings, sort_keys=True).encode())
+    return os.path.join(cache_dir, f"{os.path.basename(input_file)}-{digest.hexdigest()[:16]}")
+
+
+def save_graph(graph, path):
+    vocab_bytes = "\n".join(graph.vocab).encode("utf-8")
+    padding = b"\0" * (-len(vocab_bytes) % 4)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, BYTEORDER, len(graph.vocab), len(graph.targets), len(vocab_bytes))
+
+    # 先写临时文件再原子替换，避免并发读取到写了一半的快照
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(header)
+        file.write(vocab_bytes)
+        file.write(padding)
+        for values in (graph.offsets, graph.targets, graph.weights, graph.pred_offsets, graph.pred_sources):
+            file.write(array("i", values).tobytes())
+    os.replace(temp_path, path)
+
+
+def load_graph(path):
+    # 通过 mmap 加载快照：边数组直接引用映射内存，不做拷贝；格式不符时返回 None
+    with open(path, "rb") as file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return None
+    if len(mapped) < HEADER.size:
+        return None
+    magic, version, byteorder, node_count, edge_count, vocab_size = HEADER.unpack_from(mapped)
+    if magic != MAGIC or version != FORMAT_VERSION or byteorder != BYTEORDER:
+        return None
+    # 文件被截断（如写入时磁盘已满）或有多余内容时视为未命中，重新建图
+    array_size = 4 * (3 * edge_count + 2 * node_count + 2)
+    if len(mapped) != HEADER.size + vocab_size + (-vocab_size % 4) + array_size:
+        return None
+
+    position = HEADER.size
+    try:
+        words = mapped[position:position + vocab_size].decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    vocab = [sys.intern(word) for word in words.split("\n")]
+    if node_count == 0:
+        vocab = []
+    position += vocab_size + (-vocab_size % 4)
+
+    view = memoryview(mapped)
+    arrays = []
+    for length in (node_count + 1, edge_count, edge_count, node_count + 1, edge_count):
+        arrays.append(view[position:position + 4 * length].cast("i"))
+        position += 4 * length
+    return CSRGraph(vocab, *arrays)
+
+
+@instrument.instrumented("load_or_build_graph")
+def load_or_build_graph(input_file, cache_dir=CACHE_DIR, rebuild=False, tokenizer=None):
+    # 命中缓存时直接 mmap 加载，否则流式建图并写入快照；同一语料、同一设置下内容已过期的旧快照会被删除
+    os.makedirs(cache_dir, exist_ok=True)
+    settings = preprocess_settings(tokenizer)
+    prefix = snapshot_prefix(input_file, settings, cache_dir)
+    path = f"{prefix}-{cache_key(input_file, settings)}.graph"
+
+    if not rebuild and os.path.exists(path):
+        graph = load_graph(path)
+        if graph is not None:
+            graph.graph['snapshot'] = path
+            instrument.count("graph_cache.hits")
+            instrument.record_graph_size("graph", graph)
+            return graph
+
+    instrument.count("graph_cache.misses")
+    with open(input_file, "r") as file:
+        graph = CSRGraph.from_edge_arrays(*count_edge_arrays(iter_words(read_chunks(file), tokenizer)))
+    # 删除同一语料、同一设置下的旧快照及其派生文件（如布局缓存）
+    for stale_path in glob.glob(glob.escape(prefix) + "-*"):
+        if not stale_path.startswith(path):
+            os.remove(stale_path)
+    save_graph(graph, path)
+    graph.graph['snapshot'] = path
+    instrument.record_graph_size("graph", graph)
+    return graph
@@ -0,0 +1,90 @@
+import heapq
+from collections import deque
+
+# 大图的裁剪与无界面导出，不依赖 matplotlib，可在命令行或服务器上直接使用
+
+# DOT 导出时高亮路径使用的颜色（与 tab10 颜色映射一致）
+HIGHLIGHT_COLORS = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
+                    "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf"]
+
+
+def induced_subgraph(graph, nodes):
+    # 由节点集合导出的子图（networkx.DiGraph），同时适用于 networkx 图和 CSR 图
+    import networkx as nx
+
+    subgraph = nx.DiGraph()
+    subgraph.add_nodes_from(nodes)
+    for word in nodes:
+        for neighbor, data in graph[word].items():
+            if neighbor in subgraph:
+                subgraph.add_edge(word, neighbor, weight=data.get('weight', 1))
+    return subgraph
+
+
+def focus_subgraph(graph, words, hops=1, max_nodes=None):
+    # 以查询词为中心的 k 跳邻域（沿出边和入边），最多保留 max_nodes 个节点；查询词本身总是保留
+    seeds = [word for word in dict.fromkeys(words) if word in graph]
+    distance = {word: 0 for word in seeds}
+    queue = deque(seeds)
+    while queue:
+        word = queue.popleft()
+        if distance[word] >= hops:
+            continue
+        for neighbor in list(graph.successors(word)) + list(graph.predecessors(word)):
+            if neighbor in distance:
+                continue
+            if max_nodes is not None and len(distance) >= max_nodes:
+                queue.clear()
+                break
+            distance[neighbor] = distance[word] + 1
+            queue.append(neighbor)
+    return induced_subgraph(graph, list(distance))
+
+
+def top_weighted_subgraph(graph, top_n):
+    # 权值最大的 top_n 条边构成的子图，用堆选取而不对所有边排序
+    import networkx as nx
+
+    edges = heapq.nlargest(top_n, graph.edges(data=True), key=lambda edge: edge[2].get('weight', 1))
+    subgraph = nx.DiGraph()
+    for word1, word2, data in edges:
+        subgraph.add_edge(word1, word2, weight=data.get('weight', 1))
+    return subgraph
+
+
+def restrict_graph(graph, focus=None, hops=1, top_n=None, max_nodes=None):
+    # 按需裁剪：先取查询词的邻域，再保留权值最大的 top_n 条边
+    if focus:
+        graph = focus_subgraph(graph, focus, hops, max_nodes)
+    if top_n is not None:
+        graph = top_weighted_subgraph(graph, top_n)
+    return graph
+
+
+def quote_dot(word):
+    return '"' + str(word).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def write_dot(graph, output_file, paths=None):
+    # 导出 Graphviz DOT 文本，可用 dot -Tsvg 等工具离线渲染；paths 中的路径边会被高亮
+    highlight = {}
+    for idx, path in enumerate(paths or []):
+        for i in range(len(path) - 1):
+            highlight.setdefault((path[i], path[i + 1]), HIGHLIGHT_COLORS[idx % len(HIGHLIGHT_COLORS)])
+
+    with open(output_file, "w") as file:
+        file.write("digraph G {\n")
+        file.write("    node [shape=circle, style=filled, fillcolor=skyblue];\n")
+        for word in graph.nodes():
+            file.write(f"    {quote_dot(word)};\n")
+        for word1, word2, data in graph.edges(data=True):
+            attributes = f'label="{data.get("weight", 1)}"'
+            color = highlight.get((word1, word2))
+            if color is not None:
+                attributes += f', color="{color}", penwidth=2.5'
+            file.write(f"    {quote_dot(word1)} -> {quote_dot(word2)} [{attributes}];\n")
+        file.write("}\n")
+
+
+def is_dot_file(output_file):
+    return output_file.lower().endswith((".dot", ".gv"))
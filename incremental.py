@@ -0,0 +1,62 @@
+from graph_builder import count_edge_weights, iter_words, read_chunks
+
+
+def graph_version(graph):
+    # 图的版本号，每次增量更新后加一；派生缓存以 (id, 版本号) 判断是否过期
+    return graph.graph.get('version', 0)
+
+
+# 增量建图：语料追加文本时，只对新文本分词计数，并原地累加到已有图的边权上。
+# 上一段文本的最后一个词会被记住，与新文本的第一个词构成一条边；
+# 追加的文本视为从新词开始（不会与上一段末尾的词拼接成一个词）。
+# CSR 图与快照是只读的，增量更新作用于 networkx.DiGraph。
+class GraphIngestor:
+    def __init__(self, graph=None, last_word=None, tokenizer=None):
+        if graph is None:
+            import networkx as nx  # 延迟导入：只用到 graph_version 的模块（如查询缓存）不需要 networkx
+            graph = nx.DiGraph()
+        self.graph = graph
+        self.last_word = last_word
+        self.tokenizer = tokenizer
+        self.listeners = []
+
+    @classmethod
+    def from_file(cls, input_file, tokenizer=None):
+        ingestor = cls(tokenizer=tokenizer)
+        with open(input_file, "r") as file:
+            ingestor.ingest_chunks(read_chunks(file))
+        return ingestor
+
+    def subscribe(self, listener):
+        # listener(graph, changed_edges)：图更新后调用，用于局部修补或失效派生缓存
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self.listeners.remove(listener)
+
+    def _remember_last_word(self, words):
+        for word in words:
+            self.last_word = word
+            yield word
+
+    def ingest_chunks(self, chunks):
+        previous_word = self.last_word
+        edge_weights = count_edge_weights(self._remember_last_word(iter_words(chunks, self.tokenizer)), previous_word)
+
+        # 变化的边按首次出现顺序排列（dict 键视图，支持集合运算），新边据此追加到派生索引末尾
+        changed_edges = edge_weights.keys()
+        for (current_word, next_word), weight in edge_weights.items():
+            if self.graph.has_edge(current_word, next_word):
+                self.graph[current_word][next_word]['weight'] += weight
+            else:
+                self.graph.add_edge(current_word, next_word, weight=weight)
+
+        if changed_edges:
+            self.graph.graph['version'] = graph_version(self.graph) + 1
+            for listener in self.listeners:
+                listener(self.graph, changed_edges)
+        return changed_edges
+
+    def ingest(self, text):
+        # 追加一段文本，返回权值发生变化（含新增）的边集合
+        return self.ingest_chunks([text])
@@ -0,0 +1,246 @@
+import contextlib
+import functools
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+
+# 轻量级埋点：记录各公开操作的耗时（span）、计数器（counter）和规模指标（gauge），
+# 可导出为 JSON 或 Prometheus 文本格式。
+# 默认关闭：关闭时 span() 返回共享的空上下文，instrumented 包装的函数只多一次标志判断，
+# 热循环中的计数先累加在局部变量里，结束后才调用 count()。
+# 设置环境变量 LAB1_INSTRUMENT=1，或调用 enable()（命令行的 --metrics 选项）即可开启。
+# 可选的 cProfile / tracemalloc 模式只作用于最外层的 span（每个线程各自计算），
+# 开启后开销较大，只用于定位问题。
+
+# 保留最近的 span 事件数，写入 JSON 日志
+MAX_EVENTS = 10000
+
+enabled = bool(os.environ.get("LAB1_INSTRUMENT"))
+profile_enabled = False
+memory_enabled = False
+
+_lock = threading.Lock()
+_local = threading.local()
+_spans = {}  # 名称 -> {"count", "total_seconds", "max_seconds", "peak_bytes"}
+_counters = {}
+_gauges = {}
+_events = deque(maxlen=MAX_EVENTS)
+_profiles = {}  # 名称 -> pstats.Stats（开启 profile 模式时）
+_null_span = contextlib.nullcontext()
+
+
+def enable(profile=False, trace_memory=False):
+    global enabled, profile_enabled, memory_enabled
+    enabled = True
+    profile_enabled = profile
+    memory_enabled = trace_memory
+    if trace_memory:
+        # tracemalloc 及其依赖导入较慢，只在需要时导入
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+def disable():
+    global enabled, profile_enabled, memory_enabled
+    enabled = profile_enabled = False
+    if memory_enabled:
+        import tracemalloc
+        tracemalloc.stop()
+    memory_enabled = False
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+        _gauges.clear()
+        _events.clear()
+        _profiles.clear()
+
+
+class _Span:
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = attributes
+        self.profiler = None
+        self.outermost = False
+
+    def __enter__(self):
+        depth = getattr(_local, "depth", 0)
+        _local.depth = depth + 1
+        self.outermost = depth == 0
+        if self.outermost and memory_enabled:
+            import tracemalloc
+            tracemalloc.reset_peak()
+        if self.outermost and profile_enabled:
+            import cProfile
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+                self.profiler = profiler
+            except ValueError:
+                # 已有其他分析器在运行（如另一个线程中的 span），本次不做分析
+                pass
+        self.start = time.perf_counter()
+        return self
+
+    def set(self, **attributes):
+        # 在 span 内补充属性，如结果的规模
+        self.attributes.update(attributes)
+
+    def __exit__(self, exc_type, exc, traceback):
+        elapsed = time.perf_counter() - self.start
+        _local.depth -= 1
+        if self.profiler is not None:
+            self.profiler.disable()
+        peak = None
+        if self.outermost and memory_enabled:
+            import tracemalloc
+            peak = tracemalloc.get_traced_memory()[1]
+
+        with _lock:
+            stats = _spans.get(self.name)
+            if stats is None:
+                stats = _spans[self.name] = {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0, "peak_bytes": None}
+            stats["count"] += 1
+            stats["total_seconds"] += elapsed
+            stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+            if peak is not None:
+                stats["peak_bytes"] = max(stats["peak_bytes"] or 0, peak)
+            event = {"span": self.name, "start": time.time() - elapsed, "seconds": elapsed,
+                     "thread": threading.current_thread().name}
+            if self.attributes:
+                event["attributes"] = self.attributes
+            if peak is not None:
+                event["peak_bytes"] = peak
+            if exc_type is not None:
+                event["error"] = exc_type.__name__
+            _events.append(event)
+            if self.profiler is not None:
+                import pstats
+                # 同名 span 的分析结果累积在一起
+                if self.name in _profiles:
+                    _profiles[self.name].add(self.profiler)
+                else:
+                    _profiles[self.name] = pstats.Stats(self.profiler)
+        return False
+
+
+def span(name, **attributes):
+    # with instrument.span("render.savefig"): ...
+    if not enabled:
+        return _null_span
+    return _Span(name, attributes)
+
+
+def instrumented(name):
+    # 装饰器：把整个函数调用记为一个 span
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            with _Span(name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name, value=1):
+    if not enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def gauge(name, value):
+    if not enabled:
+        return
+    with _lock:
+        _gauges[name] = value
+
+
+def record_graph_size(prefix, graph):
+    # 记录图的规模（节点数、边数）
+    if not enabled:
+        return
+    gauge(f"{prefix}.nodes", graph.number_of_nodes())
+    gauge(f"{prefix}.edges", graph.number_of_edges())
+
+
+def snapshot():
+    with _lock:
+        return {
+            "spans": {name: dict(stats) for name, stats in _spans.items()},
+            "counters": dict(_counters),
+            "gauges": dict(_gauges),
+            "events": list(_events),
+        }
+
+
+def metric_label(name):
+    return re.sub(r'["\\\n]', "_", name)
+
+
+def prometheus_text():
+    data = snapshot()
+    lines = ["# TYPE lab1_span_seconds summary"]
+    for name, stats in sorted(data["spans"].items()):
+        label = f'{{span="{metric_label(name)}"}}'
+        lines.append(f"lab1_span_seconds_count{label} {stats['count']}")
+        lines.append(f"lab1_span_seconds_sum{label} {stats['total_seconds']:.9f}")
+    lines.append("# TYPE lab1_span_max_seconds gauge")
+    for name, stats in sorted(data["spans"].items()):
+        lines.append(f'lab1_span_max_seconds{{span="{metric_label(name)}"}} {stats["max_seconds"]:.9f}')
+    peaks = [(name, stats["peak_bytes"]) for name, stats in sorted(data["spans"].items()) if stats["peak_bytes"] is not None]
+    if peaks:
+        lines.append("# TYPE lab1_span_peak_bytes gauge")
+        lines.extend(f'lab1_span_peak_bytes{{span="{metric_label(name)}"}} {peak}' for name, peak in peaks)
+    lines.append("# TYPE lab1_events_total counter")
+    for name, value in sorted(data["counters"].items()):
+        lines.append(f'lab1_events_total{{name="{metric_label(name)}"}} {value}')
+    lines.append("# TYPE lab1_size gauge")
+    for name, value in sorted(data["gauges"].items()):
+        lines.append(f'lab1_size{{name="{metric_label(name)}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path):
+    # 按扩展名选择格式：.json 为 JSON 日志（含最近的 span 事件），其余为 Prometheus 文本格式
+    with open(path, "w") as file:
+        if path.lower().endswith(".json"):
+            json.dump(snapshot(), file, ensure_ascii=False, indent=2)
+        else:
+            file.write(prometheus_text())
+
+
+def write_profiles(directory):
+    # 每个 span 的 cProfile 结果写为 <名称>.prof，可用 python -m pstats 或 snakeviz 查看
+    os.makedirs(directory, exist_ok=True)
+    with _lock:
+        profiles = dict(_profiles)
+    for name, stats in profiles.items():
+        stats.dump_stats(os.path.join(directory, re.sub(r"[^\w.-]", "_", name) + ".prof"))
+
+
+def add_arguments(parser):
+    # 命令行版与图形界面共用的埋点选项
+    parser.add_argument("--metrics", help="开启埋点，退出时把耗时与计数写入该文件（.json 为 JSON 日志，其余为 Prometheus 文本格式）")
+    parser.add_argument("--profile", metavar="DIR", help="同时用 cProfile 分析各操作，结果写入该目录")
+    parser.add_argument("--trace-memory", action="store_true", help="同时用 tracemalloc 记录各操作的峰值内存")
+
+
+def configure(args):
+    if args.metrics or args.profile or args.trace_memory:
+        enable(profile=bool(args.profile), trace_memory=args.trace_memory)
+
+
+def finish(args):
+    if args.metrics:
+        write_metrics(args.metrics)
+    if args.profile:
+        write_profiles(args.profile)
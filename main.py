@@ -1,244 +1,152 @@
-import matplotlib.pyplot as plt
 import tkinter as tk
-import networkx as nx
-import string
-import random
-import heapq
-from collections import defaultdict
-from collections import deque
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from PIL import Image, ImageTk
-
-
-def preprocess_text(text):
-    # 替换非字母字符为空格
-    translation_table = str.maketrans(string.punctuation, ' ' * len(string.punctuation))
-    cleaned_text = text.translate(translation_table)
-    return cleaned_text.lower()
-
-
-def traverse_graph(graph):
-    # 初始化一个空列表存储节点名称
-    node_names = []
-
-    # 定义一个辅助函数进行深度优先搜索
-    def dfs(node):
-        # 将当前节点加入到节点名称列表中
-        node_names.append(node)
-
-        # 遍历当前节点的所有邻居节点
-        for neighbor in graph.neighbors(node):
-            # 如果邻居节点还没有被访问过,递归访问它
-            if neighbor not in node_names:
-                dfs(neighbor)
-
-    # 从图中任意一个节点开始进行深度优先搜索
-    for node in graph.nodes():
-        if node not in node_names:
-            dfs(node)
-    return node_names
-
-
-def build_directed_graph(text):
-    cleaned_text = preprocess_text(text)
-    words = cleaned_text.split()
-
-    # 创建有向图
-    graph = nx.DiGraph()
-
-    # 字典来存储每对相邻单词出现的次数
-    edge_weights = defaultdict(int)
-
-    # 遍历单词并记录权重
-    for i in range(len(words) - 1):
-        current_word = words[i].lower()
-        next_word = words[i + 1].lower()
-        if current_word != next_word:  # 排除自环
-            edge_weights[(current_word, next_word)] += 1
-
-    # 添加节点和边到图中
-    for (current_word, next_word), weight in edge_weights.items():
-        graph.add_edge(current_word, next_word, weight=weight)
-
-    return graph
-
-
-def draw_and_save_graph(graph, output_file):
-    # 创建一个新的 Figure 对象
-    figure = plt.figure(figsize=(10, 6))
-    pos = nx.spring_layout(graph)
-
-    # 绘制节点和边
-    nx.draw(graph, pos, with_labels=True, node_color='skyblue', node_size=1500, edge_color='black', linewidths=1,
-            arrowsize=20)
-
-    # 获取边的权值
-    edge_labels = nx.get_edge_attributes(graph, 'weight')
-
-    # 绘制边的权值
-    nx.draw_networkx_edge_labels(graph, pos, edge_labels=edge_labels)
-
-    plt.title("Directed Graph")
-
-    # 保存图形到磁盘
-    plt.savefig(output_file)
-    return figure
-
-def draw_and_save_graph_1(graph, paths, output_file):
-    figure = plt.figure(figsize=(10, 6))
-    pos = nx.spring_layout(graph)
-
-    # 绘制节点和边
-    nx.draw(graph, pos, with_labels=True, node_color='skyblue', node_size=1500, edge_color='black', linewidths=1,
-            arrowsize=20)
-
-    # 获取边的权值
-    edge_labels = nx.get_edge_attributes(graph, 'weight')
-    nx.draw_networkx_edge_labels(graph, pos, edge_labels=edge_labels)
-
-    # 高亮显示所有最短路径
-    if paths:
-        colors = plt.cm.get_cmap('tab10', len(paths))  # 使用颜色映射
-        for idx, path in enumerate(paths):
-            edges = [(path[i], path[i + 1]) for i in range(len(path) - 1)]
-            nx.draw_networkx_edges(graph, pos, edgelist=edges, edge_color=[colors(idx)], width=2.5)
-
-    plt.title("Directed Graph with Shortest Paths")
-
-    # 保存图形到磁盘
-    plt.savefig(output_file)
-    return figure
-
-
-def all_simple_paths(graph, start, goal):
-    def dfs(current, goal, path, visited, result):
-        if current == goal:
-            result.append(path[:])
-            return
-        for neighbor in graph[current]:
-            if neighbor not in visited:
-                visited.add(neighbor)
-                path.append(neighbor)
-                dfs(neighbor, goal, path, visited, result)
-                path.pop()
-                visited.remove(neighbor)
-
-    result = []
-    dfs(start, goal, [start], {start}, result)
-    return result
-
-
-def find_bridge_words(graph, word1, word2):
-    if word1 not in graph or word2 not in graph:
-        return None
-
-    # 查找word1到word2的所有可能路径
-    try:
-        # all_paths = nx.all_simple_paths(graph, source=word1, target=word2)
-        all_paths = all_simple_paths(graph, word1, word2)
-    except nx.exception.NodeNotFound:
-        return None
-
-    # 初始化桥接词列表
-    bridge_words = []
-
-    # 遍历每条路径
-    for path in all_paths:
-        if len(path) == 3:  # 路径长度为3意味着有一个桥接词
-            bridge_words.append(path[1])
-
-    return bridge_words
-
-
-def generate_by_bridge_words(graph, text):
-    cleaned_text = preprocess_text(text)
-    words = cleaned_text.split()
-    word2add = []
-
-    # 寻找所有可能的桥接词并记录
-    for i in range(len(words) - 1):
-        bridge_words = find_bridge_words(graph, words[i], words[i + 1])
-        if bridge_words:
-            word2add.append((i, random.choice(bridge_words)))
-
-    # 按记录的位置插入桥接词
-    offset = 0
-    for index, bridge_word in word2add:
-        words.insert(index + 1 + offset, bridge_word)
-        offset += 1
-
-    return words
-
-def all_shortest_paths(graph, start, target, weight='weight'):
-    # 使用优先队列跟踪当前节点的所有路径和距离
-    queue = [(0, start, [])]  # (累计权重, 当前节点, 路径)
-    min_dist = {start: 0}
-    all_paths = []
-
-    while queue:
-        cost, current_node, path = heapq.heappop(queue)
-        path = path + [current_node]
-
-        if current_node == target:
-            all_paths.append((cost, path))
-            continue
-
-        for neighbor, data in graph[current_node].items():
-            edge_weight = data.get(weight, 1)
-            new_cost = cost + edge_weight
-
-            if neighbor not in min_dist or new_cost <= min_dist[neighbor]:
-                min_dist[neighbor] = new_cost
-                heapq.heappush(queue, (new_cost, neighbor, path))
-
-    # 过滤出所有最短路径
-    if not all_paths:
-        return None
-
-    min_cost = min(all_paths, key=lambda x: x[0])[0]
-    shortest_paths = [path for cost, path in all_paths if cost == min_cost]
-
-    return shortest_paths
-
-def find_shortest(graph, word1, word2):
-    try:
-        # 使用Dijkstra算法查找带权图的最短路径
-        path = all_shortest_paths(graph, word1, word2, weight='weight')
-        figure = draw_and_save_graph_1(graph, path, "shortest_path.png")
-        return path
-    except nx.NetworkXNoPath:
-        return None
-    except nx.NodeNotFound:
-        return None
+import argparse
+import threading
+from functools import partial
+from tkinter import ttk
+from bridge_words import BridgeWordIndex, find_bridge_words, generate_by_bridge_words, weighted_bridge_sampler
+from graph_builder import TOKENIZERS, preprocess_text, build_directed_graph
+from graph_cache import load_or_build_graph
+import instrument
+from query_cache import QueryCache
+from shortest_paths import PAIR_MAX_PATHS, all_shortest_paths, path_length
+from traversal import all_simple_paths, traverse_graph
+from workers import QueryRunner
+import walks
+
+# 背景图片
+BACKGROUND_IMAGE_FILE = "3.png"
+
+# 下列函数原先定义在 main.py 中，现已移到各自的模块；保留导入，兼容 from main import ...
+__all__ = [
+    "preprocess_text", "build_directed_graph", "traverse_graph", "all_simple_paths",
+    "find_bridge_words", "generate_by_bridge_words", "all_shortest_paths",
+    "draw_and_save_graph", "draw_and_save_graph_1", "find_shortest", "show_graph_in_window", "main",
+]
+
+
+def lazy_render(name):
+    # 绘图函数依赖 matplotlib 和 networkx，首次调用时才导入 render 模块；
+    # 在后台线程中调用时，这些导入也不会阻塞界面
+    def call(*args, **kwargs):
+        import render
+        return getattr(render, name)(*args, **kwargs)
+    call.__name__ = name
+    return call
+
+
+def lazy_value(factory):
+    # 首次调用时才构造（通常在后台线程中），之后复用；加锁避免两个工作线程重复构造
+    lock = threading.Lock()
+    value = []
+
+    def get():
+        with lock:
+            if not value:
+                value.append(factory())
+            return value[0]
+    return get
+
+
+draw_and_save_graph = lazy_render("draw_and_save_graph")
+draw_and_save_graph_1 = lazy_render("draw_and_save_graph_1")
+find_shortest = lazy_render("find_shortest")
+find_shortest_from = lazy_render("find_shortest_from")
 
 
 def show_graph_in_window(graph, output_file):
     figure = draw_and_save_graph(graph, output_file)
+    show_figure_in_window(figure)
 
+
+def show_figure_in_window(figure):
     # 创建一个新的 Tkinter 顶层窗口
     window = tk.Toplevel()
     window.title("Graph")
 
-    # 创建一个用于展示图形的 FigureCanvasTkAgg 对象
+    # 创建一个用于展示图形的 FigureCanvasTkAgg 对象（此时 matplotlib 已随绘图导入）
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
     canvas = FigureCanvasTkAgg(figure, window)
     canvas.draw()
     canvas.get_tk_widget().pack()
 
 
-def main():
-    input_file = "input.txt"  # 输入的文本文件路径
-    output_graph_file = "directed_graph.png"  # 用于画图按钮的输出文件路径
-    output_bridge_file = "bridge_words_output.txt"  # 用于桥连词按钮的输出文件路径
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="软件工程实验一")
+    parser.add_argument("--input", default="input.txt", help="输入的文本文件路径")
+    parser.add_argument("--tokenizer", default="punctuation", choices=sorted(TOKENIZERS),
+                        help="分词规则：punctuation（原有规则）、ascii（仅 ASCII 字母）、unicode（Unicode 字母）")
+    parser.add_argument("--rebuild-cache", action="store_true", help="忽略已有的图快照，强制重新建图")
+    parser.add_argument("--cache-stats", action="store_true", help="退出时输出查询缓存的命中/未命中/淘汰次数")
+    instrument.add_arguments(parser)
+    return parser.parse_args(argv)
 
-    with open(input_file, "r") as file:
-        text = file.read()
 
-    def show_graph(graph, output_file, output_text):
-        show_graph_in_window(graph, output_file)
+def main(argv=None):
+    args = parse_args(argv)
+    instrument.configure(args)
+    input_file = args.input  # 输入的文本文件路径
+    output_graph_file = "directed_graph.png"  # 用于画图按钮的输出文件路径
 
-        # 更新画图按钮对应的文本框中的信息
-        update_text_output(graph, output_text)
+    # 所有窗口共用同一个图：优先从快照缓存加载，语料变化时自动重建
+    graph = load_or_build_graph(input_file, rebuild=args.rebuild_cache, tokenizer=args.tokenizer)
+    # 桥接词索引需要遍历整个图（20MB 语料上约 1.5 秒），在首次桥接词查询或生成新文本时
+    # 才于后台线程中建立，不拖慢主窗口的显示
+    bridge_index = lazy_value(lambda: BridgeWordIndex(graph))
+    # 所有窗口共用的查询缓存，图的版本变化后自动失效；
+    # 最短路径的结果连同渲染出的图片一起缓存，图片较大，单独限制条数
+    query_cache = QueryCache(graph)
+    image_cache = QueryCache(graph, maxsize=32)
+    bridge_lookup = query_cache.wrap("bridge", lambda word1, word2: bridge_index().query(word1, word2), edge_local=True)
+    # 按桥接词得分（两条边权值之积）加权抽样，用于生成新文本
+    weighted_sampler = lazy_value(lambda: weighted_bridge_sampler(graph, bridge_index()))
+
+    def bridge_sampler(word1, word2, rng):
+        return weighted_sampler()(word1, word2, rng)
+
+    def cached_find_shortest(word1, word2):
+        # 并列最短路径可能有数千条，只高亮并列出前 PAIR_MAX_PATHS 条
+        return image_cache.call_with_file("shortest", "shortest_path.png",
+                                          partial(find_shortest, graph, max_paths=PAIR_MAX_PATHS), word1, word2)
+
+    def cached_find_shortest_from(word):
+        # 每个目标只取 find_shortest_from 默认的少量路径，避免并列最短路径数爆炸
+        return image_cache.call_with_file("shortest_from", "shortest_path.png", partial(find_shortest_from, graph), word)
+    # 随机游走引擎（等概率 / 按权重），各节点的出边表在多次游走之间共用
+    walk_engines = {weighted: walks.WalkEngine(graph, weighted) for weighted in (False, True)}
+
+    # 背景图片约 1 MB，首次需要时才解码，并在所有窗口间共用
+    background = {}
+
+    def background_image():
+        if "image" not in background:
+            background["image"] = tk.PhotoImage(file=BACKGROUND_IMAGE_FILE)
+        return background["image"]
+
+    def make_progress(parent):
+        # 后台查询进行中时显示的进度条
+        progress = ttk.Progressbar(parent, mode="indeterminate", length=200)
+        progress.pack(side=tk.TOP)
+        return progress
+
+    def cancel_on_close(window):
+        # 窗口关闭时取消其尚未完成的查询
+        window.bind("<Destroy>", lambda event: runner.cancel(window) if event.widget is window else None)
+
+    def show_error(output_text):
+        def on_error(error):
+            output_text.delete("1.0", tk.END)  # 清空原有内容
+            output_text.insert(tk.END, f"查询失败: {error}\n")
+        return on_error
+
+    def show_graph(graph, output_file, output_text, window, progress):
+        # 绘图在后台线程中进行，完成后回到主线程展示
+        def on_done(figure):
+            show_figure_in_window(figure)
+
+            # 更新画图按钮对应的文本框中的信息
+            update_text_output(graph, output_text)
+
+        runner.submit(window, draw_and_save_graph, (graph, output_file), on_done, show_error(output_text), progress)
 
     def update_text_output(graph, output_text):
         # 定义Text组件中的不同标签样式
@@ -271,7 +179,7 @@ def main():
         canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
         # 创建一个 label 并设置为背景
-        bg_label = tk.Label(canvas, image=bg_image)
+        bg_label = tk.Label(canvas, image=background_image())
         bg_label.place(x=0, y=0, relwidth=1, relheight=1)
 
         # 在 Canvas 组件中添加内容
@@ -279,11 +187,14 @@ def main():
         output_frame_graph.pack(pady=20)
 
         # 相关的 UI 组件
-        graph = build_directed_graph(text)
         button_draw_graph = tk.Button(output_frame_graph, text="有向图",
-                                      command=lambda: show_graph(graph, output_graph_file, output_text_graph))
+                                      command=lambda: show_graph(graph, output_graph_file, output_text_graph,
+                                                                 scrollable_window, progress_graph))
         button_draw_graph.pack(pady=20)
 
+        progress_graph = make_progress(output_frame_graph)
+        cancel_on_close(scrollable_window)
+
         output_text_graph = tk.Text(output_frame_graph, height=10, width=50)
         output_text_graph.pack(side=tk.LEFT, pady=20)
 
@@ -292,17 +203,27 @@ def main():
 
     # ***************最短路径*************
     def open_shortpath_window():
-        def show_shortest_path2(graph, word1, word2):
-            shortest_path = find_shortest(graph, word1, word2)
-            for i in range(len(shortest_path)):
-                output_text2_short.insert(tk.END,
-                                        f"The shortest path from {word1} to {word2} is: {', '.join(shortest_path[i])}，len = {len(shortest_path[i])}\n")
-
         def show_shortest_paths(graph, word):
-            node_names = traverse_graph(graph)
-            node_names.remove(word)
-            for node in node_names:
-                show_shortest_path2(graph, word, node)
+            if not graph.has_node(word):
+                output_text2_short.insert(tk.END, f"No {word} in the graph!\n")
+                return
+
+            def shortest_paths_text(word):
+                # 在后台线程中拼接全部结果，主线程只做一次插入
+                results = cached_find_shortest_from(word)
+                lines = [f"The shortest path from {word} to {node} is: {', '.join(path)}，len = {len(path)}，distance = {distance}"
+                         for node, (distance, shortest_path) in results.items() for path in shortest_path]
+                # 不可达的节点也给出提示
+                lines.extend(f"No path from {word} to {node}!" for node in graph.nodes()
+                             if node != word and node not in results)
+                return "".join(line + "\n" for line in lines)
+
+            def on_done(text):
+                output_text2_short.delete("1.0", tk.END)  # 清空原有内容
+                output_text2_short.insert(tk.END, text)
+
+            runner.submit(scrollable_window, shortest_paths_text, (word,), on_done,
+                          show_error(output_text2_short), progress_short)
 
         def show_shortest_path(graph):
             word1 = input_entry3.get().lower()
@@ -315,11 +236,21 @@ def main():
                 show_shortest_paths(graph, word1)
             
             else:
-                shortest_path = find_shortest(graph, word1, word2)
-                output_text_short.delete("1.0", tk.END)  # 清空原有内容
-                for i in range(len(shortest_path)):
-                    output_text_short.insert(tk.END,
-                                            f"The shortest path from {word1} to {word2} is: {', '.join(shortest_path[i])}，len = {len(shortest_path[i])}\n")
+                def shortest_path_text(word1, word2):
+                    # 在后台线程中拼接结果，主线程只做一次插入
+                    shortest_path = cached_find_shortest(word1, word2)
+                    if not shortest_path:
+                        return f"No path from {word1} to {word2}!\n"
+                    distance = path_length(graph, shortest_path[0])
+                    return "".join(f"The shortest path from {word1} to {word2} is: {', '.join(path)}，len = {len(path)}，distance = {distance}\n"
+                                   for path in shortest_path)
+
+                def on_done(text):
+                    output_text_short.delete("1.0", tk.END)  # 清空原有内容
+                    output_text_short.insert(tk.END, text)
+
+                runner.submit(scrollable_window, shortest_path_text, (word1, word2), on_done,
+                              show_error(output_text_short), progress_short)
 
         # 创建一个新的 Toplevel 窗口
         scrollable_window = tk.Toplevel(root)
@@ -330,7 +261,7 @@ def main():
         canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
         # 创建一个 label 并设置为背景
-        bg_label = tk.Label(canvas, image=bg_image)
+        bg_label = tk.Label(canvas, image=background_image())
         bg_label.place(x=0, y=0, relwidth=1, relheight=1)
 
         # 在 Canvas 组件中添加内容
@@ -352,6 +283,9 @@ def main():
                                       command=lambda: show_shortest_path(graph))
         button_short_path.pack(side=tk.TOP, pady=20)
 
+        progress_short = make_progress(output_frame_short_path)
+        cancel_on_close(scrollable_window)
+
         output_text_short = tk.Text(output_frame_short_path, height=5, width=50)
         output_text_short.pack()
 
@@ -365,10 +299,16 @@ def main():
     def open_gentext_window():
         def gen_new_text(grapg):
             text1 = input_entry5.get().lower()
-            text2 = generate_by_bridge_words(graph, text1)
-            output_gen_text.delete("1.0", tk.END)  # 清空原有内容
-            output_gen_text.insert(tk.END, f"The new sentence is: {' '.join(text2)}\n")
-            # 创建一个新的 Toplevel 窗口
+
+            def on_done(text2):
+                output_gen_text.delete("1.0", tk.END)  # 清空原有内容
+                output_gen_text.insert(tk.END, f"The new sentence is: {' '.join(text2)}\n")
+
+            sampler = bridge_sampler if weighted_gentext.get() else None
+            runner.submit(scrollable_window, generate_by_bridge_words, (graph, text1, None, bridge_lookup, sampler), on_done,
+                          show_error(output_gen_text), progress_gentext)
+
+        # 创建一个新的 Toplevel 窗口
 
         scrollable_window = tk.Toplevel(root)
         scrollable_window.title("生成新文本窗口")
@@ -378,7 +318,7 @@ def main():
         canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
         # 创建一个 label 并设置为背景
-        bg_label = tk.Label(canvas, image=bg_image)
+        bg_label = tk.Label(canvas, image=background_image())
         bg_label.place(x=0, y=0, relwidth=1, relheight=1)
 
         # 在 Canvas 组件中添加内容
@@ -394,6 +334,12 @@ def main():
         button_gen_new_text = tk.Button(output_frame_gentext, text="生成新文本", command=lambda: gen_new_text(graph))
         button_gen_new_text.pack(side=tk.TOP, pady=20)
 
+        weighted_gentext = tk.BooleanVar(value=False)
+        tk.Checkbutton(output_frame_gentext, text="按边权重选择桥接词", variable=weighted_gentext).pack()
+
+        progress_gentext = make_progress(output_frame_gentext)
+        cancel_on_close(scrollable_window)
+
         output_gen_text = tk.Text(output_frame_gentext, height=5, width=50)
         output_gen_text.pack()
 
@@ -406,15 +352,18 @@ def main():
             word1 = input_entry1.get().lower()
             word2 = input_entry2.get().lower()
             if graph.has_node(word1) and graph.has_node(word2):
-                bridge_words = find_bridge_words(graph, word1, word2)
-                if bridge_words:
-                    # 将桥连词输出到相应的文本框中
-                    output_text_bridge.delete("1.0", tk.END)  # 清空原有内容
-                    output_text_bridge.insert(tk.END,
-                                              f"The bridge words from {word1} to {word2} are: {', '.join(bridge_words)}\n")
-                else:
-                    output_text_bridge.delete("1.0", tk.END)  # 清空原有内容
-                    output_text_bridge.insert(tk.END, f"No bridge words from {word1} to {word2}!\n")
+                def on_done(bridge_words):
+                    if bridge_words:
+                        # 将桥连词输出到相应的文本框中
+                        output_text_bridge.delete("1.0", tk.END)  # 清空原有内容
+                        output_text_bridge.insert(tk.END,
+                                                  f"The bridge words from {word1} to {word2} are: {', '.join(bridge_words)}\n")
+                    else:
+                        output_text_bridge.delete("1.0", tk.END)  # 清空原有内容
+                        output_text_bridge.insert(tk.END, f"No bridge words from {word1} to {word2}!\n")
+
+                runner.submit(scrollable_window, bridge_lookup, (word1, word2), on_done,
+                              show_error(output_text_bridge), progress_bridge)
             else:
                 output_text_bridge.delete("1.0", tk.END)  # 清空原有内容
                 output_text_bridge.insert(tk.END, f"No {word1} or {word2} in the graph!\n")
@@ -428,7 +377,7 @@ def main():
         canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
         # 创建一个 label 并设置为背景
-        bg_label = tk.Label(canvas, image=bg_image)
+        bg_label = tk.Label(canvas, image=background_image())
         bg_label.place(x=0, y=0, relwidth=1, relheight=1)
 
         # 在 Canvas 组件中添加内容
@@ -449,6 +398,9 @@ def main():
         button_bridge_words = tk.Button(output_frame_bridge, text="桥接词", command=find_bridge_words_button_click)
         button_bridge_words.pack(side=tk.TOP, pady=20)
 
+        progress_bridge = make_progress(output_frame_bridge)
+        cancel_on_close(scrollable_window)
+
         output_text_bridge = tk.Text(output_frame_bridge, height=5, width=50)
         output_text_bridge.pack()
 
@@ -457,45 +409,25 @@ def main():
 
     # ***************随机游走**********************
     def open_randwalk_window():
-        def random_walk(graph):
-            # 随机选择起始节点
-            current_node = random.choice(list(graph.nodes()))
-
-            # 记录经过的节点和边
-            visited_nodes = [current_node]
-            visited_edges = []
-
-            # 随机遍历直到出现重复边或没有出边的节点
-            while True:
-                # 如果当前节点没有出边，或者所有出边都已经访问过，停止遍历
-                if not graph.out_edges(current_node):
-                    break
-
-                # 从当前节点的出边中随机选择一个
-                next_node = random.choice(list(graph.successors(current_node)))
-
-                # 记录经过的边和节点
-                visited_nodes.append(next_node)
-
-                if (current_node, next_node) in visited_edges:
-                    break
-
-                visited_edges.append((current_node, next_node))
-
-                # 移动到下一个节点
-                current_node = next_node
-
-            sentence = ' '.join(visited_nodes)
+        def random_walk(weighted):
+            walk = walk_engines[weighted].walk()
             # 指定要保存的文件路径
             file_path = "random_walk.txt"
 
-            # 将数据写入文本文件
-            with open(file_path, "w") as file:
-                file.write(sentence)
+            # 每次游走追加一行，保留之前的结果
+            walks.write_walks([walk], file_path, append=True)
+            return ' '.join(walk), file_path
 
-            output_randwalk.delete("1.0", tk.END)  # 清空原有内容
-            output_randwalk.insert(tk.END, f"The random walk result is:\n {sentence}\n")
-            output_randwalk.insert(tk.END, f"数据已成功写入文件: {file_path}\n")
+        def start_random_walk():
+            # 游走和写文件在后台线程中进行，完成后回到主线程展示
+            def on_done(result):
+                sentence, file_path = result
+                output_randwalk.delete("1.0", tk.END)  # 清空原有内容
+                output_randwalk.insert(tk.END, f"The random walk result is:\n {sentence}\n")
+                output_randwalk.insert(tk.END, f"数据已成功追加到文件: {file_path}\n")
+
+            runner.submit(scrollable_window, random_walk, (weighted_randwalk.get(),), on_done, show_error(output_randwalk),
+                          progress_randwalk)
 
         # 创建一个新的 Toplevel 窗口
         scrollable_window = tk.Toplevel(root)
@@ -506,7 +438,7 @@ def main():
         canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
         # 创建一个 label 并设置为背景
-        bg_label = tk.Label(canvas, image=bg_image)
+        bg_label = tk.Label(canvas, image=background_image())
         bg_label.place(x=0, y=0, relwidth=1, relheight=1)
 
         # 在 Canvas 组件中添加内容
@@ -514,9 +446,16 @@ def main():
         output_frame_randwalk.pack(pady=20)
 
         # 相关的 UI 组件
-        button_randwalk = tk.Button(output_frame_randwalk, text="开始随机游走", command=lambda: random_walk(graph))
+        button_randwalk = tk.Button(output_frame_randwalk, text="开始随机游走", command=start_random_walk)
         button_randwalk.pack(side=tk.TOP, pady=20)
 
+        # 是否按边的权重选择下一个节点
+        weighted_randwalk = tk.BooleanVar(value=False)
+        tk.Checkbutton(output_frame_randwalk, text="按边权重游走", variable=weighted_randwalk).pack()
+
+        progress_randwalk = make_progress(output_frame_randwalk)
+        cancel_on_close(scrollable_window)
+
         output_randwalk = tk.Text(output_frame_randwalk, height=5, width=50)
         output_randwalk.pack()
 
@@ -528,16 +467,22 @@ def main():
     root.title("GUI")
     root.geometry("600x600")  # 宽度 x 高度
 
-    # 加载图片文件
-    bg_image = tk.PhotoImage(file="3.png")
+    # 后台查询执行器，所有窗口共用
+    runner = QueryRunner(root)
 
-    # 创建一个 label 并设置为背景
-    bg_label = tk.Label(root, image=bg_image)
+    def load_main_background(event):
+        if event.widget is root:
+            root.unbind("<Map>")
+            root.after_idle(lambda: bg_label.configure(image=background_image()))
+
+    root.bind("<Map>", load_main_background)
+
+    # 创建一个 label 作为背景；背景图片在主窗口显示之后再加载
+    bg_label = tk.Label(root)
     bg_label.place(x=0, y=0, relwidth=1, relheight=1)
 
     label = tk.Label(root, text="软件工程实验一", font=("STLiti", 24, "bold"), fg="green")
     label.pack(pady=20)
-    graph = build_directed_graph(text)
     # ************有向图************
     open_button = tk.Button(root, text="有向图", command=open_graph_window)
     open_button.pack(pady=15)
@@ -559,6 +504,12 @@ def main():
     open_button.pack(pady=15)
 
     root.mainloop()
+    runner.shutdown()
+    instrument.finish(args)
+
+    if args.cache_stats:
+        print(f"query cache: {query_cache.stats()}")
+        print(f"image cache: {image_cache.stats()}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,137 @@
+import os
+import threading
+from collections import OrderedDict
+
+from incremental import graph_version
+
+
+def file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+# 查询结果缓存：有界 LRU，键为 (图版本号, 查询名, 参数)。
+# 每次访问都会检查图的版本号，未经 invalidate 通知的版本变化会使所有旧条目整体失效。
+# 把 invalidate 注册为 GraphIngestor 的监听器（排在派生索引的 update 之后）时改为选择性失效：
+#   edge_local 查询  参数为 (word1, word2)，结果只取决于 word1 的出边和 word2 的入边（如桥接词），
+#                    只删除 word1 是某条变化边的起点、或 word2 是某条变化边的终点的条目，其余条目保留；
+#                    结果为 None（单词不在图中）的条目，只要任一参数出现在变化的边上（可能是新加入的节点）也删除
+#   其余查询        最短路径、渲染出的图片等可能受任意一条边影响，仍整体失效
+# 查询在后台线程中执行，字典操作由锁保护；同一查询并发未命中时可能重复计算，结果相同。
+# 缓存的结果由多个调用方共用，调用方不应修改它们。
+class QueryCache:
+    def __init__(self, graph, maxsize=1024):
+        self.graph = graph
+        self.maxsize = maxsize
+        self.version = graph_version(graph)
+        self.entries = OrderedDict()
+        self.edge_local = set()  # edge_local 查询的名称
+        self.lock = threading.Lock()
+        # 渲染并读回输出文件的整个过程持有该锁，避免并发查询读到彼此的图片
+        self.file_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _key(self, name, args):
+        # 调用方需持有 self.lock
+        version = graph_version(self.graph)
+        if version != self.version:
+            self._clear(version)
+        return (version, name, args)
+
+    def _clear(self, version):
+        if self.entries:
+            self.invalidations += 1
+        self.entries.clear()
+        self.version = version
+
+    def invalidate(self, graph=None, changed_edges=None):
+        # 签名与 GraphIngestor 的监听器一致；不给出 changed_edges，或期间错过了其他更新时整体失效
+        with self.lock:
+            version = graph_version(self.graph)
+            if changed_edges is None or version != self.version + 1:
+                self._clear(version)
+                return
+            sources = {word1 for word1, word2 in changed_edges}
+            targets = {word2 for word1, word2 in changed_edges}
+            words = sources | targets
+            kept = OrderedDict()
+            for (_, name, args), value in self.entries.items():
+                if name not in self.edge_local or args[0] in sources or args[1] in targets:
+                    continue
+                if value is None and (args[0] in words or args[1] in words):
+                    continue
+                kept[(version, name, args)] = value
+            if len(kept) < len(self.entries):
+                self.invalidations += 1
+            self.entries = kept
+            self.version = version
+
+    def lookup(self, name, args):
+        # 返回 (是否命中, 结果)
+        with self.lock:
+            key = self._key(name, args)
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return True, self.entries[key]
+            self.misses += 1
+            return False, None
+
+    def store(self, name, args, value):
+        with self.lock:
+            self.entries[self._key(name, args)] = value
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def call(self, name, func, *args):
+        hit, value = self.lookup(name, args)
+        if not hit:
+            value = func(*args)
+            self.store(name, args, value)
+        return value
+
+    def call_with_file(self, name, output_file, func, *args):
+        # 用于会写出图片的查询：结果与输出文件的内容（如 PNG 字节）一起缓存，
+        # 命中时直接写回文件，不再重新渲染。渲染与读回在 file_lock 内完成，
+        # 两个后台线程同时查询时，缓存的字节一定是本次查询渲染出的图片
+        with self.file_lock:
+            hit, value = self.lookup(name, args)
+            if hit:
+                result, data = value
+                if data is not None:
+                    with open(output_file, "wb") as file:
+                        file.write(data)
+                return result
+
+            before = file_stamp(output_file)
+            result = func(*args)
+            data = None
+            stamp = file_stamp(output_file)
+            if stamp is not None and stamp != before:
+                # 只缓存本次调用新写出的文件（未写文件时不会误存旧图片）
+                with open(output_file, "rb") as file:
+                    data = file.read()
+        self.store(name, args, (result, data))
+        return result
+
+    def wrap(self, name, func, edge_local=False):
+        # 返回带缓存的函数，参数需可哈希；edge_local 的含义见类前的说明
+        if edge_local:
+            self.edge_local.add(name)
+
+        def cached(*args):
+            return self.call(name, func, *args)
+        cached.__name__ = getattr(func, "__name__", name)
+        return cached
+
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "invalidations": self.invalidations, "size": len(self.entries), "maxsize": self.maxsize}
@@ -0,0 +1,252 @@
+import heapq
+import json
+import os
+import threading
+import weakref
+
+import matplotlib
+import networkx as nx
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+
+import instrument
+from cancellation import QueryCancelled, current_event
+from csr_graph import CSRGraph
+from graph_export import is_dot_file, restrict_graph, write_dot
+from incremental import graph_version
+from shortest_paths import SINGLE_SOURCE_MAX_PATHS, all_shortest_paths, single_source_shortest_paths
+
+# matplotlib 的绘制不是线程安全的，后台线程中的渲染串行执行
+render_lock = threading.Lock()
+
+# 固定随机种子，使同一个图的布局在多次运行之间保持一致
+LAYOUT_SEED = 42
+
+# 节点数超过该值时使用大图模式：节点和边各用一个集合（collection）批量绘制，
+# 不画箭头，节点标签和边权值标签只保留最重要的一部分
+LARGE_GRAPH_NODES = 150
+MAX_NODE_LABELS = 50
+MAX_EDGE_LABELS = 50
+LARGE_LAYOUT_ITERATIONS = 15
+
+# 每个图的渲染状态，随图对象被回收而释放：
+#   version  生成该状态时的图版本号，版本变化后重新计算
+#   graph    CSR 图转换得到的 networkx 图（本身就是 networkx 图时为 None）
+#   pos      布局坐标，每个图版本只计算一次
+#   figures  最短路径底图（按是否大图模式区分），多次查询共用，每次只增删高亮的路径边
+_render_states = weakref.WeakKeyDictionary()
+
+
+def as_networkx(graph):
+    # 绘图需要 networkx.DiGraph，CSR 图在此转换
+    if isinstance(graph, CSRGraph):
+        return graph.to_networkx()
+    return graph
+
+
+def layout_file(graph):
+    # 从快照加载且未被修改过的图，其布局可以缓存到快照旁边的文件中
+    snapshot = graph.graph.get('snapshot')
+    if snapshot is None or graph_version(graph) != 0:
+        return None
+    return snapshot + ".layout.json"
+
+
+def compute_layout(graph, nx_graph, previous_pos=None):
+    path = layout_file(graph)
+    if previous_pos is None and path is not None and os.path.exists(path):
+        with open(path, "r") as file:
+            pos = {word: tuple(xy) for word, xy in json.load(file).items()}
+        if pos.keys() == set(nx_graph.nodes()):
+            return pos
+
+    # 图更新后以旧坐标作为初始位置，避免节点在前后两张图之间大幅跳动
+    initial_pos = None
+    if previous_pos:
+        initial_pos = {word: previous_pos[word] for word in nx_graph if word in previous_pos} or None
+    iterations = LARGE_LAYOUT_ITERATIONS if nx_graph.number_of_nodes() > LARGE_GRAPH_NODES else 50
+    with instrument.span("render.layout", nodes=nx_graph.number_of_nodes()):
+        try:
+            pos = nx.spring_layout(nx_graph, pos=initial_pos, iterations=iterations, seed=LAYOUT_SEED)
+        except ImportError:
+            # 500 个节点以上的 spring_layout 依赖 scipy；未安装时改用只依赖 numpy 的 ForceAtlas2
+            pos = nx.forceatlas2_layout(nx_graph, pos=initial_pos, max_iter=iterations, seed=LAYOUT_SEED)
+    pos = {word: tuple(float(value) for value in xy) for word, xy in pos.items()}
+
+    if path is not None:
+        with open(path, "w") as file:
+            json.dump(pos, file)
+    return pos
+
+
+def render_state(graph):
+    # 取得（必要时重建）图的渲染状态；调用方需持有 render_lock
+    version = graph_version(graph)
+    state = _render_states.get(graph)
+    if state is None or state['version'] != version:
+        nx_graph = as_networkx(graph)
+        previous_pos = state['pos'] if state is not None else None
+        state = {
+            'version': version,
+            'graph': nx_graph if nx_graph is not graph else None,
+            'pos': compute_layout(graph, nx_graph, previous_pos),
+            'figures': {},
+        }
+        _render_states[graph] = state
+    return state
+
+
+def use_large_mode(graph, mode='auto'):
+    # mode 为 'full'（逐个绘制）、'large'（集合批量绘制）或 'auto'（按节点数选择）
+    if mode == 'auto':
+        return graph.number_of_nodes() > LARGE_GRAPH_NODES
+    return mode == 'large'
+
+
+def draw_base(ax, graph, pos, large=False):
+    if large:
+        draw_large_base(ax, graph, pos)
+        return
+
+    # 绘制节点和边
+    nx.draw_networkx(graph, pos, ax=ax, with_labels=True, node_color='skyblue', node_size=1500,
+                     edge_color='black', linewidths=1, arrowsize=20)
+    ax.set_axis_off()
+
+    # 获取边的权值
+    edge_labels = nx.get_edge_attributes(graph, 'weight')
+
+    # 绘制边的权值
+    nx.draw_networkx_edge_labels(graph, pos, edge_labels=edge_labels, ax=ax)
+
+
+def draw_large_base(ax, graph, pos):
+    # 所有边合成一个 LineCollection，所有节点合成一次 scatter，绘制开销与图的规模线性相关
+    nodes = list(graph.nodes())
+    ax.add_collection(LineCollection([(pos[word1], pos[word2]) for word1, word2 in graph.edges()],
+                                     colors='black', linewidths=0.3, alpha=0.4, zorder=1))
+    ax.scatter([pos[word][0] for word in nodes], [pos[word][1] for word in nodes],
+               s=20, c='skyblue', edgecolors='none', zorder=2)
+
+    # 只标注度数最大的节点和权值最大的边
+    for word in heapq.nlargest(MAX_NODE_LABELS, nodes, key=graph.degree):
+        ax.text(*pos[word], word, fontsize=7, ha='center', va='center', zorder=3)
+    heaviest_edges = heapq.nlargest(MAX_EDGE_LABELS, graph.edges(data=True), key=lambda edge: edge[2].get('weight', 1))
+    for word1, word2, data in heaviest_edges:
+        x = (pos[word1][0] + pos[word2][0]) / 2
+        y = (pos[word1][1] + pos[word2][1]) / 2
+        ax.text(x, y, str(data.get('weight', 1)), fontsize=6, color='dimgray', ha='center', va='center', zorder=3)
+
+    ax.autoscale_view()
+    ax.set_axis_off()
+
+
+def draw_highlights(ax, graph, pos, paths, large=False):
+    # 在底图上叠加高亮的路径边，返回新增的图元以便之后移除
+    highlights = []
+    colors = matplotlib.colormaps['tab10']  # 使用颜色映射
+    cancelled = current_event()
+    for idx, path in enumerate(paths or []):
+        if cancelled is not None and cancelled.is_set():
+            # 查询已被取代：移除已画上的高亮，保持共用的底图干净
+            for artist in highlights:
+                artist.remove()
+            raise QueryCancelled()
+        edges = [(path[i], path[i + 1]) for i in range(len(path) - 1)]
+        if not edges:
+            continue
+        color = colors(idx % colors.N)
+        if large:
+            collection = LineCollection([(pos[word1], pos[word2]) for word1, word2 in edges],
+                                        colors=[color], linewidths=2.5, zorder=4)
+            ax.add_collection(collection)
+            highlights.append(collection)
+        else:
+            artists = nx.draw_networkx_edges(graph, pos, edgelist=edges, edge_color=[color], width=2.5,
+                                             node_size=1500, arrowsize=20, ax=ax)
+            highlights.extend(artists if isinstance(artists, list) else [artists])
+    return highlights
+
+
+@instrument.instrumented("draw_and_save_graph")
+def draw_and_save_graph(graph, output_file, mode='auto', focus=None, hops=1, top_n=None):
+    # focus / top_n 用于只绘制查询词的 k 跳邻域或权值最大的 top_n 条边；
+    # 输出文件的扩展名决定格式：.png / .svg 由 matplotlib 保存，.dot / .gv 导出为 Graphviz 文本
+    if focus or top_n is not None:
+        graph = restrict_graph(graph, focus, hops, top_n)
+    if is_dot_file(output_file):
+        write_dot(graph, output_file)
+        return None
+
+    with render_lock:
+        state = render_state(graph)
+        nx_graph = state['graph'] or graph
+        large = use_large_mode(nx_graph, mode)
+
+        # 创建一个新的 Figure 对象；使用面向对象接口而非 pyplot，可以在后台线程中绘制。
+        # 返回的 Figure 会嵌入窗口，不放入 pyplot 的全局列表，窗口关闭后即可回收
+        figure = Figure(figsize=(10, 6))
+        ax = figure.add_axes((0, 0, 1, 1))
+        with instrument.span("render.draw", large=large):
+            draw_base(ax, nx_graph, state['pos'], large)
+        ax.set_title("Directed Graph")
+
+        # 保存图形到磁盘
+        with instrument.span("render.savefig"):
+            figure.savefig(output_file)
+    return figure
+
+@instrument.instrumented("draw_and_save_graph_1")
+def draw_and_save_graph_1(graph, paths, output_file, mode='auto', hops=None):
+    # hops 不为 None 时只绘制路径上各节点的 k 跳邻域，每次生成独立的图
+    if hops is not None:
+        graph = restrict_graph(graph, [word for path in paths or [] for word in path], hops)
+    if is_dot_file(output_file):
+        write_dot(graph, output_file, paths)
+        return None
+
+    with render_lock:
+        state = render_state(graph)
+        nx_graph = state['graph'] or graph
+        large = use_large_mode(nx_graph, mode)
+
+        # 底图（节点、边、权值）每个图版本只画一次
+        figure = state['figures'].get(large)
+        if figure is None:
+            figure = Figure(figsize=(10, 6))
+            ax = figure.add_axes((0, 0, 1, 1))
+            with instrument.span("render.draw", large=large):
+                draw_base(ax, nx_graph, state['pos'], large)
+            ax.set_title("Directed Graph with Shortest Paths")
+            state['figures'][large] = figure
+        ax = figure.axes[0]
+
+        # 高亮显示所有最短路径
+        highlights = draw_highlights(ax, nx_graph, state['pos'], paths, large)
+
+        # 保存图形到磁盘，随后移除本次的高亮，底图留给下一次查询
+        try:
+            with instrument.span("render.savefig"):
+                figure.savefig(output_file)
+        finally:
+            for artist in highlights:
+                artist.remove()
+    return figure
+
+
+@instrument.instrumented("find_shortest")
+def find_shortest(graph, word1, word2, max_paths=None):
+    # 使用Dijkstra算法查找带权图的最短路径；不可达或单词不在图中时 all_shortest_paths 返回 None
+    path = all_shortest_paths(graph, word1, word2, weight='weight', max_paths=max_paths)
+    draw_and_save_graph_1(graph, path, "shortest_path.png")
+    return path
+
+
+@instrument.instrumented("find_shortest_from")
+def find_shortest_from(graph, word, max_paths=SINGLE_SOURCE_MAX_PATHS):
+    # 单源最短路径：一次 Dijkstra 求出 word 到所有可达节点的距离和路径（每个目标最多 max_paths 条），
+    # 最后只渲染一张图
+    results = single_source_shortest_paths(graph, word, weight='weight', max_paths=max_paths)
+    paths = [path for distance, target_paths in results.values() for path in target_paths]
+    draw_and_save_graph_1(graph, paths, "shortest_path.png")
+    return results
@@ -0,0 +1,46 @@
+import argparse
+import random
+import sys
+
+from bridge_words import BRIDGE_SCORES, rewrite_lines, weighted_bridge_sampler
+from graph_cache import load_or_build_graph
+
+
+# 批量改写：用语料图中的桥接词逐行改写整个文件
+# 运行方式：python -m rewrite 待改写文件 [-o 输出文件] [--corpus input.txt] [--seed 42] [--weighted]
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="根据桥接词批量生成新文本")
+    parser.add_argument("input", help="待改写的文本文件，'-' 表示标准输入")
+    parser.add_argument("-o", "--output", default="-", help="输出文件，默认写到标准输出")
+    parser.add_argument("--corpus", default="input.txt", help="用于建图的语料文件")
+    parser.add_argument("--tokenizer", default="punctuation", help="建图使用的分词规则")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子，指定后结果可复现")
+    parser.add_argument("--weighted", action="store_true", help="按桥接词得分加权选择（默认等概率）")
+    parser.add_argument("--score", default="product", choices=sorted(BRIDGE_SCORES), help="配合 --weighted 使用的得分")
+    parser.add_argument("--rebuild-cache", action="store_true", help="忽略已有的图快照，强制重新建图")
+    return parser.parse_args(argv)
+
+
+def rewrite_file(graph, input_path, output_path="-", rng=None, sampler=None):
+    # 逐行改写 input_path 写入 output_path，'-' 表示标准输入 / 标准输出；命令行版的 generate --file 也调用它
+    source = sys.stdin if input_path == "-" else open(input_path, "r")
+    output = sys.stdout if output_path == "-" else open(output_path, "w")
+    try:
+        rewrite_lines(graph, source, output, rng, sampler=sampler)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    graph = load_or_build_graph(args.corpus, rebuild=args.rebuild_cache, tokenizer=args.tokenizer)
+    rng = random.Random(args.seed)
+    sampler = weighted_bridge_sampler(graph, score=args.score) if args.weighted else None
+    rewrite_file(graph, args.input, args.output, rng, sampler)
+
+
+if __name__ == "__main__":
+    main()
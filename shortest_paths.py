@@ -0,0 +1,115 @@
+import heapq
+from itertools import islice
+
+import instrument
+from cancellation import QueryCancelled, check, current_event
+
+# 单源模式下每个目标默认只取的最短路径条数：并列最短路径的条数可能随距离指数增长，
+# 全部枚举并高亮会使结果数以千万计
+SINGLE_SOURCE_MAX_PATHS = 1
+
+# 图形界面中两词查询最多高亮并列出的最短路径条数，并列路径可能有数千条
+PAIR_MAX_PATHS = 20
+
+
+def dijkstra_predecessors(graph, start, target=None, weight='weight'):
+    # 运行一次 Dijkstra，记录最短路径前驱 DAG：
+    # preds[v] 为所有满足 dist[u] + w(u, v) == dist[v] 的 u（即所有紧边）
+    # 给定 target 时，target 出队（距离确定）后立即停止；查询被取消时抛出 QueryCancelled
+    cancelled = current_event()
+    dist = {}
+    tentative = {start: 0}
+    preds = {start: []}
+    queue = [(0, start)]
+    pushes = 1  # 堆操作次数在局部变量中累加，结束后一次性计入埋点
+
+    while queue:
+        if cancelled is not None and cancelled.is_set():
+            raise QueryCancelled()
+        cost, current_node = heapq.heappop(queue)
+        if current_node in dist:
+            continue
+        dist[current_node] = cost
+        if current_node == target:
+            break
+
+        for neighbor, data in graph[current_node].items():
+            if neighbor in dist:
+                continue
+            new_cost = cost + data.get(weight, 1)
+            old_cost = tentative.get(neighbor)
+            if old_cost is None or new_cost < old_cost:
+                tentative[neighbor] = new_cost
+                preds[neighbor] = [current_node]
+                heapq.heappush(queue, (new_cost, neighbor))
+                pushes += 1
+            elif new_cost == old_cost:
+                preds[neighbor].append(current_node)
+
+    if instrument.enabled:
+        instrument.count("dijkstra.runs")
+        instrument.count("dijkstra.heap_pushes", pushes)
+        instrument.count("dijkstra.nodes_settled", len(dist))
+    return dist, preds
+
+
+def iter_shortest_paths(preds, start, target):
+    # 从 target 沿前驱 DAG 回溯到 start，用显式栈惰性地逐条生成路径。
+    # DAG 中每个节点都能回溯到 start，两条路径之间的工作量不超过路径长度，每产生一条路径检查一次取消
+    cancelled = current_event()
+    if target == start:
+        yield [start]
+        return
+    if target not in preds:
+        return
+
+    path = [target]
+    stack = [iter(preds[target])]
+    while stack:
+        node = next(stack[-1], None)
+        if node is None:
+            stack.pop()
+            path.pop()
+            continue
+        path.append(node)
+        if node == start:
+            check(cancelled)
+            yield path[::-1]
+            path.pop()
+        else:
+            stack.append(iter(preds[node]))
+
+
+def iter_all_shortest_paths(graph, start, target, weight='weight'):
+    if start not in graph or target not in graph:
+        return iter(())
+    dist, preds = dijkstra_predecessors(graph, start, target, weight)
+    if target not in dist:
+        return iter(())
+    return iter_shortest_paths(preds, start, target)
+
+
+@instrument.instrumented("all_shortest_paths")
+def all_shortest_paths(graph, start, target, weight='weight', max_paths=None):
+    # 返回 start 到 target 的所有最短路径（最多 max_paths 条），不可达时返回 None
+    paths = list(islice(iter_all_shortest_paths(graph, start, target, weight), max_paths))
+    instrument.count("shortest_paths.paths_enumerated", len(paths))
+    return paths or None
+
+
+@instrument.instrumented("single_source_shortest_paths")
+def single_source_shortest_paths(graph, source, weight='weight', max_paths=None):
+    # 单源模式：只运行一次完整的 Dijkstra，返回 {target: (距离, 最短路径列表)}，按距离从小到大排列
+    if source not in graph:
+        return {}
+    dist, preds = dijkstra_predecessors(graph, source, weight=weight)
+    results = {target: (distance, list(islice(iter_shortest_paths(preds, source, target), max_paths)))
+               for target, distance in dist.items() if target != source}
+    if instrument.enabled:
+        instrument.count("shortest_paths.paths_enumerated", sum(len(paths) for distance, paths in results.values()))
+    return results
+
+
+def path_length(graph, path, weight='weight'):
+    # 路径上各边权值之和
+    return sum(graph[path[i]][path[i + 1]].get(weight, 1) for i in range(len(path) - 1))
@@ -0,0 +1,69 @@
+import threading
+
+import networkx as nx
+import pytest
+
+from cancellation import QueryCancelled, run_cancellable
+from shortest_paths import dijkstra_predecessors, single_source_shortest_paths
+from workers import QueryRunner
+
+
+class FakeRoot:
+    # QueryRunner 只用到 root.after；测试中不运行 Tk 主循环
+    def after(self, delay, callback):
+        pass
+
+
+def layered_graph(layers=40, width=2):
+    # 每层 width 个节点、相邻两层全连接，并列最短路径数为 width ** layers
+    graph = nx.DiGraph()
+    for layer in range(layers):
+        for i in range(width):
+            for j in range(width):
+                graph.add_edge(f"{layer}-{i}", f"{layer + 1}-{j}", weight=1)
+    return graph
+
+
+def test_cancelled_event_stops_dijkstra():
+    event = threading.Event()
+    event.set()
+    with pytest.raises(QueryCancelled):
+        run_cancellable(event, dijkstra_predecessors, layered_graph(), "0-0")
+
+
+def test_no_event_runs_to_completion():
+    dist, preds = dijkstra_predecessors(layered_graph(3), "0-0")
+    assert dist["3-1"] == 3
+
+
+def test_superseded_query_frees_worker():
+    graph = layered_graph()
+    runner = QueryRunner(FakeRoot(), max_workers=1)
+    started = threading.Event()
+
+    def enumerate_all(source):
+        started.set()
+        return single_source_shortest_paths(graph, source)  # 不限条数，2 ** 40 条路径
+
+    slow = runner.submit("window", enumerate_all, ("0-0",))
+    assert started.wait(5)
+    fast = runner.submit("window", len, ("abc",))
+    assert fast.result(timeout=5) == 3
+    assert isinstance(slow.exception(timeout=0), QueryCancelled)
+    runner.shutdown()
+
+
+def test_cancel_key_stops_running_query():
+    graph = layered_graph()
+    runner = QueryRunner(FakeRoot(), max_workers=1)
+    started = threading.Event()
+
+    def enumerate_all(source):
+        started.set()
+        return single_source_shortest_paths(graph, source)
+
+    slow = runner.submit("window", enumerate_all, ("0-0",))
+    assert started.wait(5)
+    runner.cancel("window")
+    assert isinstance(slow.exception(timeout=5), QueryCancelled)
+    runner.shutdown()
@@ -0,0 +1,39 @@
+from bridge_words import BridgeWordIndex
+from incremental import GraphIngestor
+from query_cache import QueryCache
+
+
+def make_cached_bridge():
+    ingestor = GraphIngestor()
+    ingestor.ingest("a b")
+    index = BridgeWordIndex(ingestor.graph)
+    cache = QueryCache(ingestor.graph)
+    ingestor.subscribe(index.update)
+    ingestor.subscribe(cache.invalidate)
+    return ingestor, index, cache, cache.wrap("bridge", index.query, edge_local=True)
+
+
+def test_new_word_invalidates_not_in_graph_result():
+    # "c" 不在图中时缓存了 None；追加 "c" 后新增边 b->c，"c" 成为节点，结果应重新计算
+    ingestor, index, cache, bridge = make_cached_bridge()
+    assert bridge("c", "b") is None
+    ingestor.ingest("c")
+    assert index.query("c", "b") == []
+    assert bridge("c", "b") == []
+
+
+def test_unrelated_entries_survive_update():
+    ingestor, index, cache, bridge = make_cached_bridge()
+    ingestor.ingest("c")
+    assert bridge("a", "b") == []
+    ingestor.ingest("d")  # 新增边 c->d，与 (a, b) 无关
+    assert bridge("a", "b") == []
+    assert cache.hits == 1
+
+
+def test_changed_edges_invalidate_affected_entries():
+    ingestor, index, cache, bridge = make_cached_bridge()
+    ingestor.ingest("c")
+    assert bridge("a", "c") == ["b"]
+    ingestor.ingest("a x c")  # 新增边 a->x、x->c，x 也成为 a 到 c 的桥接词
+    assert bridge("a", "c") == ["b", "x"]
@@ -0,0 +1,124 @@
+from collections import deque
+
+import instrument
+
+# 图的遍历工具：全部使用显式栈/队列实现，不受递归深度限制；
+# 已访问节点记录在集合中，整体复杂度为 O(V+E)。
+# 同时适用于 networkx.DiGraph 和 CSR 图（只用到 nodes()/successors()）。
+
+
+def dfs_preorder(graph, sources=None):
+    # 深度优先前序遍历，依次从 sources（默认为所有节点）中尚未访问的节点出发；
+    # 访问顺序与递归实现完全相同
+    visited = set()
+    for source in graph.nodes() if sources is None else sources:
+        if source in visited:
+            continue
+        visited.add(source)
+        yield source
+        stack = [iter(graph.successors(source))]
+        while stack:
+            for neighbor in stack[-1]:
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    yield neighbor
+                    stack.append(iter(graph.successors(neighbor)))
+                    break
+            else:
+                stack.pop()
+
+
+def bfs_order(graph, source):
+    # 从 source 出发的广度优先遍历顺序
+    visited = {source}
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        yield node
+        for neighbor in graph.successors(node):
+            if neighbor not in visited:
+                visited.add(neighbor)
+                queue.append(neighbor)
+
+
+def reachable(graph, source):
+    # 从 source 出发可以到达的所有节点（包括 source 本身）
+    return set(dfs_preorder(graph, [source]))
+
+
+def strongly_connected_components(graph):
+    # 迭代版 Tarjan 算法，按逆拓扑序逐个产生强连通分量（节点集合）
+    index = {}
+    lowlink = {}
+    on_stack = set()
+    component_stack = []
+    counter = 0
+    for root in graph.nodes():
+        if root in index:
+            continue
+        index[root] = lowlink[root] = counter
+        counter += 1
+        component_stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph.successors(root)))]
+        while work:
+            node, neighbors = work[-1]
+            for neighbor in neighbors:
+                if neighbor not in index:
+                    index[neighbor] = lowlink[neighbor] = counter
+                    counter += 1
+                    component_stack.append(neighbor)
+                    on_stack.add(neighbor)
+                    work.append((neighbor, iter(graph.successors(neighbor))))
+                    break
+                if neighbor in on_stack:
+                    lowlink[node] = min(lowlink[node], index[neighbor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = set()
+                    while True:
+                        member = component_stack.pop()
+                        on_stack.discard(member)
+                        component.add(member)
+                        if member == node:
+                            break
+                    yield component
+
+
+@instrument.instrumented("traverse_graph")
+def traverse_graph(graph):
+    # 按深度优先前序返回所有节点
+    return list(dfs_preorder(graph))
+
+
+def iter_simple_paths(graph, start, goal):
+    # 逐条产生从 start 到 goal 的所有简单路径，顺序与递归实现相同
+    if start == goal:
+        yield [start]
+        return
+    path = [start]
+    visited = {start}
+    stack = [iter(graph.successors(start))]
+    while stack:
+        for neighbor in stack[-1]:
+            if neighbor in visited:
+                continue
+            if neighbor == goal:
+                yield path + [neighbor]
+                continue
+            path.append(neighbor)
+            visited.add(neighbor)
+            stack.append(iter(graph.successors(neighbor)))
+            break
+        else:
+            stack.pop()
+            visited.discard(path.pop())
+
+
+@instrument.instrumented("all_simple_paths")
+def all_simple_paths(graph, start, goal):
+    return list(iter_simple_paths(graph, start, goal))
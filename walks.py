@@ -0,0 +1,181 @@
+import random
+
+import instrument
+from incremental import graph_version
+
+# 批量游走时每个任务包含的游走条数
+WALK_CHUNK_SIZE = 256
+
+
+def build_alias_table(weights):
+    # Vose 别名法：O(n) 预处理后，每次按权重抽样只需 O(1)
+    n = len(weights)
+    total = sum(weights)
+    scaled = [weight * n / total for weight in weights]
+    prob = [1.0] * n
+    alias = list(range(n))
+    small = [i for i, value in enumerate(scaled) if value < 1.0]
+    large = [i for i, value in enumerate(scaled) if value >= 1.0]
+    while small and large:
+        less = small.pop()
+        more = large.pop()
+        prob[less] = scaled[less]
+        alias[less] = more
+        scaled[more] = scaled[more] + scaled[less] - 1.0
+        if scaled[more] < 1.0:
+            small.append(more)
+        else:
+            large.append(more)
+    # 剩余项的概率因浮点误差略偏离 1，直接取 1
+    return prob, alias
+
+
+# 随机游走引擎：每个节点的出边列表（加权模式下还有别名表）在首次经过时建立并缓存，
+# 多次游走共用。图的版本号变化后缓存自动失效。
+#   weighted=False  等概率选择出边，与原先 rng.choice(list(graph.successors(...))) 的结果一致
+#   weighted=True   按边权重成比例地选择出边
+class WalkEngine:
+    def __init__(self, graph, weighted=False):
+        self.graph = graph
+        self.weighted = weighted
+        self.version = None
+        self.nodes = None
+        self.tables = {}  # 节点 -> (后继列表, 概率表, 别名表)
+
+    def _refresh(self):
+        version = graph_version(self.graph)
+        if self.nodes is None or version != self.version:
+            self.version = version
+            self.nodes = list(self.graph.nodes())
+            self.tables = {}
+
+    def table(self, node):
+        table = self.tables.get(node)
+        if table is None:
+            if self.weighted:
+                # 后继与权值在同一次遍历中读出，不逐个按邻居查边（CSR 图上按邻居查边需要额外开销）
+                successors = []
+                weights = []
+                for neighbor, data in self.graph[node].items():
+                    successors.append(neighbor)
+                    weights.append(data.get('weight', 1))
+            else:
+                successors = list(self.graph.successors(node))
+            if self.weighted and successors:
+                prob, alias = build_alias_table(weights)
+            else:
+                prob = alias = None
+            table = (successors, prob, alias)
+            self.tables[node] = table
+        return table
+
+    def build_all(self):
+        # 预先建立所有节点的表，供进程池中的工作进程直接使用
+        self._refresh()
+        for node in self.nodes:
+            self.table(node)
+        return self
+
+    @instrument.instrumented("random_walk")
+    def walk(self, rng=None):
+        rng = rng if rng is not None else random
+        self._refresh()
+        return self._walk(rng)
+
+    def _walk(self, rng):
+        # 随机选择起始节点
+        current_node = rng.choice(self.nodes)
+
+        # 记录经过的节点和边；已访问的边放在集合中，判断重复为 O(1)
+        visited_nodes = [current_node]
+        visited_edges = set()
+
+        # 随机遍历直到出现重复边或没有出边的节点
+        while True:
+            successors, prob, alias = self.table(current_node)
+            if not successors:
+                break
+
+            if prob is None:
+                next_node = rng.choice(successors)
+            else:
+                # 一个随机数同时决定列号和是否取别名
+                u = rng.random() * len(successors)
+                i = int(u)
+                next_node = successors[i if u - i < prob[i] else alias[i]]
+
+            # 记录经过的边和节点
+            visited_nodes.append(next_node)
+
+            edge = (current_node, next_node)
+            if edge in visited_edges:
+                break
+            visited_edges.add(edge)
+
+            # 移动到下一个节点
+            current_node = next_node
+
+        return visited_nodes
+
+    def walks(self, count, seed=None, workers=None):
+        # 生成 count 条游走。第 i 条游走使用由 (seed, i) 派生的独立随机数流，
+        # 因此结果与是否使用进程池、进程数多少无关；seed 为 None 时随机选取
+        if seed is None:
+            seed = random.getrandbits(64)
+        chunks = [(seed, start, min(start + WALK_CHUNK_SIZE, count)) for start in range(0, count, WALK_CHUNK_SIZE)]
+
+        if not workers or workers <= 1 or len(chunks) <= 1:
+            self._refresh()
+            for chunk in chunks:
+                yield from self._walk_chunk(*chunk)
+            return
+
+        # 进程池：把预先建立好的表传给工作进程，不需要序列化图本身；
+        # multiprocessing 导入较慢，只在使用进程池时才导入
+        from concurrent.futures import ProcessPoolExecutor
+        self.build_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.nodes, self.tables)) as executor:
+            for batch in executor.map(_walk_chunk_in_worker, chunks):
+                yield from batch
+
+    def _walk_chunk(self, seed, start, stop):
+        return [self._walk(random.Random(f"{seed}:{index}")) for index in range(start, stop)]
+
+
+# 工作进程中的游走引擎，由 _init_worker 建立
+_worker_engine = None
+
+
+def _init_worker(nodes, tables):
+    global _worker_engine
+    engine = WalkEngine(None)
+    engine.nodes = nodes
+    engine.tables = tables
+    _worker_engine = engine
+
+
+def _walk_chunk_in_worker(chunk):
+    return _worker_engine._walk_chunk(*chunk)
+
+
+def random_walk(graph, rng=None, weighted=False):
+    return WalkEngine(graph, weighted).walk(rng)
+
+
+def save_walk(sentence, file_path="random_walk.txt"):
+    with open(file_path, "w") as file:
+        file.write(sentence)
+
+
+@instrument.instrumented("write_walks")
+def write_walks(walk_iter, file_path="random_walk.txt", append=False):
+    # 逐条写出游走结果（每行一条），不在内存中累积全部结果；返回写出的条数。
+    # append=True 时追加到文件末尾，保留之前的游走结果
+    count = 0
+    with open(file_path, "a" if append else "w") as file:
+        for walk in walk_iter:
+            file.write(' '.join(walk))
+            file.write("\n")
+            count += 1
+    return count
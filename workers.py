@@ -0,0 +1,104 @@
+import queue
+import traceback
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from cancellation import run_cancellable
+
+
+# 后台查询执行器：耗时的查询和渲染在线程池中运行，Tk 主循环不会被阻塞。
+# 工作线程只把结果放进队列，由主线程通过 root.after 定时取出并调用回调，
+# 因此所有 Tk 控件只会在主线程中被访问。
+# 每个查询有一个 key（通常是所属窗口）：同一 key 上的新查询会取代旧查询，
+# 尚未开始的旧任务被取消；已在运行的旧任务会收到取消信号（见 cancellation），
+# 在下一个检查点抛出 QueryCancelled 退出，其结果（或异常）被丢弃。
+# 查询函数只读共享的图；图的修改（如增量更新）不应与查询并发进行。
+class QueryRunner:
+    POLL_INTERVAL = 50  # 轮询结果队列的间隔（毫秒）
+
+    def __init__(self, root, max_workers=2):
+        self.root = root
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="query")
+        self.results = queue.Queue()
+        self.generations = {}  # key -> 最新一次提交的编号
+        self.futures = {}  # key -> 最新一次提交的 Future
+        self.events = {}  # key -> 最新一次提交的取消事件
+        self.progress = {}  # key -> 进度指示控件（需提供 start()/stop()）
+        self.root.after(self.POLL_INTERVAL, self._poll)
+
+    def submit(self, key, func, args=(), on_done=None, on_error=None, progress=None):
+        # 只能在主线程中调用
+        generation = self.generations.get(key, 0) + 1
+        self.generations[key] = generation
+
+        previous = self.futures.get(key)
+        if previous is not None:
+            previous.cancel()
+        self._signal_cancel(key)
+
+        if progress is not None:
+            self.progress[key] = progress
+            progress.start()
+
+        event = self.events[key] = threading.Event()
+        future = self.executor.submit(run_cancellable, event, func, *args)
+        self.futures[key] = future
+        future.add_done_callback(
+            lambda done: self.results.put((key, generation, done, on_done, on_error)))
+        return future
+
+    def cancel(self, key):
+        # 取消某个 key 上的查询，例如窗口关闭时；已在运行的任务会尽快退出，结果被丢弃
+        self.generations[key] = self.generations.get(key, 0) + 1
+        future = self.futures.pop(key, None)
+        if future is not None:
+            future.cancel()
+        self._signal_cancel(key)
+        self._stop_progress(key)
+
+    def shutdown(self):
+        for key in list(self.events):
+            self._signal_cancel(key)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _signal_cancel(self, key):
+        event = self.events.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def _stop_progress(self, key):
+        progress = self.progress.pop(key, None)
+        if progress is not None:
+            try:
+                progress.stop()
+            except Exception:
+                pass
+
+    def _poll(self):
+        while True:
+            try:
+                key, generation, future, on_done, on_error = self.results.get_nowait()
+            except queue.Empty:
+                break
+
+            # 已被新查询取代或已取消的结果直接丢弃
+            if generation != self.generations.get(key) or future.cancelled():
+                continue
+            self.futures.pop(key, None)
+            self.events.pop(key, None)
+            self._stop_progress(key)
+
+            try:
+                error = future.exception()
+                if error is None:
+                    if on_done is not None:
+                        on_done(future.result())
+                elif on_error is not None:
+                    on_error(error)
+                else:
+                    traceback.print_exception(error)
+            except Exception:
+                # 回调出错（例如窗口已关闭）不应中断轮询
+                traceback.print_exc()
+
+        self.root.after(self.POLL_INTERVAL, self._poll)